@@ -2,8 +2,8 @@
 import os, numpy as np
 from lgpd_cosmo.data import DataRepository
 from lgpd_cosmo.models import LGPDParams, CondensateParams, ElasticityParams, LGPDTransfer
-from lgpd_cosmo.cmb import apply_modifications, load_baseline_cls
-from lgpd_cosmo.likelihoods import Likelihoods
+from lgpd_cosmo.cmb import CMBModulator, load_baseline_cls
+from lgpd_cosmo.likelihoods import Likelihoods, PlanckBinnedLike
 from lgpd_cosmo.mcmc import run_emcee
 
 def main():
@@ -14,51 +14,52 @@ def main():
     tt_file = 'planck_tt_binned.csv'
     te_file = 'planck_te_binned.csv'
     ee_file = 'planck_ee_binned.csv'
-    have_tt = os.path.exists(repo.path(tt_file))
-    have_te = os.path.exists(repo.path(te_file))
-    have_ee = os.path.exists(repo.path(ee_file))
-    if have_tt:
-        ell_tt, Dl_tt, sig_tt = repo.load_simple_binned(tt_file)
-    if have_te:
-        ell_te, Dl_te, sig_te = repo.load_simple_binned(te_file)
-    if have_ee:
-        ell_ee, Dl_ee, sig_ee = repo.load_simple_binned(ee_file)
+    binned_data = {}
+    for key, fname in [('TT', tt_file), ('TE', te_file), ('EE', ee_file)]:
+        if os.path.exists(repo.path(fname)):
+            binned_data[key] = repo.load_simple_binned(fname)
 
     # Initial parameters
     lgpd = LGPDParams(log10_Gamma0=-18.5, a_star=1.0, p=2.0, T_lgpd=2.7255, xi_damp=0.1)
     cond = CondensateParams(mu0=0.05, k0=0.07, m=2.0, zt=1.5, n=3.0)
     elas = ElasticityParams(sigma0=0.05, k0=0.1, m=2.0, zt=1.5, n=3.0)
     transfer = LGPDTransfer(lgpd, cond, elas)
+    ll2pi = ell*(ell+1.0)/(2.0*np.pi)
 
-    def loglike(theta):
-        m0, s0, xd = theta
-        lgpd2 = LGPDParams(log10_Gamma0=-18.5, a_star=1.0, p=2.0, T_lgpd=2.7255, xi_damp=xd)
-        cond2 = CondensateParams(mu0=m0, k0=0.07, m=2.0, zt=1.5, n=3.0)
-        elas2 = ElasticityParams(sigma0=s0, k0=0.1, m=2.0, zt=1.5, n=3.0)
-        mod = apply_modifications(ell, base, LGPDTransfer(lgpd2, cond2, elas2))
+    # The modulation is analytic in ℓ and the baseline is smooth, so evaluate the model
+    # only at the binned ℓ centres: interpolate the baseline Dl there once, then each step
+    # modulates a few dozen points instead of the full ℓ = 2..lmax grid.
+    binned = []  # (spectrum, modulator on binned ℓ, baseline Dl at those ℓ, likelihood)
+    for key, (ell_b, Dl_b, sig_b) in binned_data.items():
+        # Bins outside the baseline ℓ range are dropped, as in add_planck_simple
+        sel = (ell_b >= ell[0]) & (ell_b <= ell[-1])
+        ell_b, Dl_b, sig_b = ell_b[sel], Dl_b[sel], sig_b[sel]
+        if len(ell_b) < 2:
+            continue  # the bin centres double as the model grid, which needs two points
+        base_b = {key: np.interp(ell_b, ell, ll2pi*base[key])}
+        binned.append((key, CMBModulator(ell_b), base_b, PlanckBinnedLike(ell_b, Dl_b, sig_b, ell_b)))
+    if not binned:
+        # Fallback: compare TT to baseline as pseudo-data on the full grid
+        modulator = CMBModulator(ell)
+        Dl_base = ll2pi*base['TT']
+        like_base = PlanckBinnedLike(ell[::10], Dl_base[::10], 0.05*Dl_base[::10] + 1.0, ell, prefactor=ll2pi)
+
+    def loglike(theta_matrix):
+        # theta_matrix: (nwalkers, 3) rows of (mu0, sigma0, xi_damp). emcee hands over the
+        # whole batch at once (vectorize=True) and all walkers are modulated in one pass.
+        tr = transfer.batched(theta_matrix)
         L = Likelihoods()
         total_chi2 = 0.0
-        if have_tt:
-            Dl_model_tt = ell*(ell+1.0)*mod['TT']/(2*np.pi)
-            total_chi2 += L.add_planck_simple(ell_tt, Dl_tt, sig_tt, ell, Dl_model_tt)
-        if have_te:
-            Dl_model_te = ell*(ell+1.0)*mod['TE']/(2*np.pi)
-            total_chi2 += L.add_planck_simple(ell_te, Dl_te, sig_te, ell, Dl_model_te)
-        if have_ee:
-            Dl_model_ee = ell*(ell+1.0)*mod['EE']/(2*np.pi)
-            total_chi2 += L.add_planck_simple(ell_ee, Dl_ee, sig_ee, ell, Dl_model_ee)
-        if not (have_tt or have_te or have_ee):
-            # Fallback: compare TT to baseline as pseudo-data
-            Dl_model = ell*(ell+1.0)*mod['TT']/(2*np.pi)
-            Dl_data  = ell*(ell+1.0)*base['TT']/(2*np.pi)
-            sig = 0.05*Dl_data + 1.0
-            total_chi2 = L.add_planck_simple(ell[::10], Dl_data[::10], sig[::10], ell, Dl_model)
+        for key, modulator_b, base_b, like in binned:
+            total_chi2 += L.add_planck_binned(like, modulator_b.apply(base_b, tr)[key])
+        if not binned:
+            total_chi2 = L.add_planck_binned(like_base, modulator.apply(base, tr)['TT'])
         return -0.5*total_chi2
 
     # Priors: (mu0, sigma0, xi_damp)
     priors = [(-0.3, 0.3), (-0.3, 0.3), (0.0, 0.02)]
     theta0 = np.array([0.0, 0.0, 0.005])
-    chain, lnp, sampler = run_emcee(loglike, theta0, priors, nwalkers=32, nsteps=500, nburn=250)
+    chain, lnp, sampler = run_emcee(loglike, theta0, priors, nwalkers=32, nsteps=500, nburn=250, vectorize=True)
     
     # Save in both formats
     os.makedirs('examples/_real_fit', exist_ok=True)
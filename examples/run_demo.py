@@ -2,11 +2,11 @@
 import numpy as np
 import os
 from lgpd_cosmo.models import LGPDParams, CondensateParams, ElasticityParams, ThreadbareParams, LGPDTransfer
-from lgpd_cosmo.cmb import apply_modifications
+from lgpd_cosmo.cmb import apply_modifications, CMBModulator
 from lgpd_cosmo.plotting import plot_cls, plot_gamma
 from lgpd_cosmo.data import DataRepository
 from lgpd_cosmo.mcmc import run_emcee
-from lgpd_cosmo.likelihoods import Likelihoods
+from lgpd_cosmo.likelihoods import Likelihoods, PlanckBinnedLike
 
 def toy_baseline_cls(lmax=2500):
     ell = np.arange(2, lmax+1)
@@ -46,7 +46,8 @@ def main():
     plot_gamma(a, Gam, os.path.join(outdir, 'gamma_demo.png'))
 
     # Tiny MCMC on synthetic binned TT
-    Dl_tt_base = ell*(ell+1.0)*base_cls['TT']/(2*np.pi)
+    ll2pi = ell*(ell+1.0)/(2.0*np.pi)
+    Dl_tt_base = ll2pi*base_cls['TT']
     # synth "data"
     Dl_data = Dl_tt_base * (1.0 + 0.0*np.random.normal(size=len(ell)))
     sigma = 0.05*Dl_tt_base + 1.0
@@ -54,6 +55,8 @@ def main():
     sel = (ell % 20)==0
     ells_b = ell[sel]; Dl_dat = Dl_data[sel]; sig = sigma[sel]
     L = Likelihoods()
+    modulator = CMBModulator(ell)
+    like_tt = PlanckBinnedLike(ells_b, Dl_dat, sig, ell, prefactor=ll2pi)
 
     def loglike(theta):
         # theta: [mu0, sigma0, xi_damp]
@@ -62,9 +65,8 @@ def main():
         cond2 = CondensateParams(mu0=m0, k0=0.07, m=2.0, zt=1.5, n=3.0)
         elas2 = ElasticityParams(sigma0=s0, k0=0.1, m=2.0, zt=1.5, n=3.0)
         tr2 = LGPDTransfer(lgpd2, cond2, elas2)
-        mod2 = apply_modifications(ell, base_cls, tr2)
-        Dl_model = ell*(ell+1.0)*mod2['TT']/(2*np.pi)
-        like = -0.5 * L.add_planck_simple(ells_b, Dl_dat, sig, ell, Dl_model)
+        mod2 = modulator.apply(base_cls, tr2)
+        like = -0.5 * L.add_planck_binned(like_tt, mod2['TT'])
         L.parts = []  # reset
         return like
 
@@ -1,10 +1,11 @@
 
 from .models import (
     LGPDParams, CondensateParams, ElasticityParams, ThreadbareParams,
-    mu_kz, sigma_kz, gamma_of_a, coherence_length, LGPDTransfer
+    LGPDParamsBatch, CondensateParamsBatch, ElasticityParamsBatch,
+    mu_kz, sigma_kz, mu_kz_batch, sigma_kz_batch, gamma_of_a, coherence_length, LGPDTransfer
 )
 from .background import LCDM, w_eff
 from .linear import GrowthModel
-from .cmb import CMBSpectra, apply_modifications, load_baseline_cls
+from .cmb import CMBSpectra, CMBModulator, apply_modifications, load_baseline_cls
 from .likelihoods import Likelihoods
 from .data import DataRepository
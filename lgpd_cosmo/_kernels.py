@@ -0,0 +1,97 @@
+
+"""Optional numba kernels for the MCMC hot path.
+
+numba is not a hard dependency. When it is missing HAVE_NUMBA is False, the kernels
+below are plain Python, and callers should use their NumPy code path instead.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except Exception:
+    HAVE_NUMBA = False
+    def njit(*args, **kwargs):
+        def wrap(fn):
+            return fn
+        return wrap
+
+# Kernels release the GIL so that emcee walkers can run them concurrently from a thread
+# pool. They are deliberately serial: launching parallel=True kernels from several threads
+# at once deadlocks numba's default workqueue threading layer, and at Nell ~ 2500 the
+# walker-level concurrency is the better place to spend the cores anyway.
+
+@njit(fastmath=True, cache=True, nogil=True)
+def modulate(cls_stack, lensed, window, lens_mask, D_env, A_L, mu_today, out):
+    """Fused CMB modulation over a (Nkeys, Nell) stack of Cls, written into out.
+
+    Row k gets D_env * (1 + 0.2 μ window), times A_L where lens_mask is set if lensed[k].
+    """
+    nkeys, n = cls_stack.shape
+    for i in range(n):
+        f = D_env[i] * (1.0 + 0.2*mu_today*window[i])
+        f_lensed = f*A_L if lens_mask[i] else f
+        for k in range(nkeys):
+            out[k, i] = cls_stack[k, i] * (f_lensed if lensed[k] else f)
+    return out
+
+@njit(fastmath=True, cache=True, nogil=True)
+def chi2_interp(idx, w_lo, w_hi, inv_sigma, Dl_data, Dl_model):
+    """Sum of squared residuals of Dl_data against Dl_model interpolated at the bins.
+
+    Fuses the gather, interpolation and reduction of PlanckBinnedLike.chi2 into one pass.
+    """
+    chi2 = 0.0
+    for i in range(idx.shape[0]):
+        j = idx[i]
+        m = Dl_model[j]*w_lo[i] + Dl_model[j+1]*w_hi[i]
+        r = (Dl_data[i] - m) * inv_sigma[i]
+        chi2 += r*r
+    return chi2
+
+@njit(fastmath=True, cache=True, nogil=True)
+def acf_direct(y, nlags):
+    """Autocorrelation of an already mean-subtracted 1-D series for lags 0..nlags-1.
+
+    Same estimator as the FFT route in scripts/convergence_diagnostics.py: lag-k
+    autocovariance sum(y[i] y[i+k]) / (N - k), normalized by the lag-0 value. One fused
+    pass per lag, no slices or temporaries; cheaper than an FFT when nlags << N.
+    """
+    n = y.shape[0]
+    out = np.empty(nlags)
+    for lag in range(nlags):
+        s = 0.0
+        for i in range(n - lag):
+            s += y[i] * y[i + lag]
+        out[lag] = s / (n - lag)
+    c0 = out[0]
+    for lag in range(nlags):
+        out[lag] /= c0
+    return out
+
+@njit(fastmath=True, cache=True, nogil=True)
+def chi2_diag(Dl_data, Dl_model, sigma):
+    """sum(((Dl_data - Dl_model) / sigma)**2) in one pass."""
+    chi2 = 0.0
+    for i in range(Dl_data.shape[0]):
+        r = (Dl_data[i] - Dl_model[i]) / sigma[i]
+        chi2 += r*r
+    return chi2
+
+@njit(fastmath=True, cache=True, nogil=True)
+def chi2_chol(Dl_data, Dl_model, L):
+    """r^T C^-1 r for r = Dl_data - Dl_model, given the lower Cholesky factor L of C.
+
+    Forward substitution L y = r, then |y|^2; only the lower triangle of L is read, so the
+    output of scipy.linalg.cho_factor(C, lower=True) can be passed as is.
+    """
+    n = Dl_data.shape[0]
+    y = np.empty(n)
+    chi2 = 0.0
+    for i in range(n):
+        s = Dl_data[i] - Dl_model[i]
+        for j in range(i):
+            s -= L[i, j] * y[j]
+        y[i] = s / L[i, i]
+        chi2 += y[i]*y[i]
+    return chi2
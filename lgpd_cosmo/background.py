@@ -1,6 +1,6 @@
 
 import numpy as np
-from scipy.integrate import quad
+from scipy.integrate import quad, cumulative_trapezoid
 
 class LCDM:
     def __init__(self, H0=67.74, Omega_m=0.315, Omega_b=0.049, Omega_k=0.0, Tcmb=2.7255):
@@ -18,10 +18,7 @@ class LCDM:
     def H(self, z, w=-1.0):
         return self.H0 * self.E(z, w=w)
 
-    def comoving_distance(self, z, w=-1.0):
-        c = 299792.458
-        integrand = lambda zp: 1.0/self.E(zp, w=w)
-        chi = quad(integrand, 0.0, z, limit=200)[0] * c / self.H0
+    def _curvature(self, chi):
         if self.Ok == 0.0:
             return chi
         sqrtOk = np.sqrt(np.abs(self.Ok))
@@ -30,12 +27,35 @@ class LCDM:
         else:
             return np.sin(sqrtOk*chi) / sqrtOk
 
+    def comoving_distance(self, z, w=-1.0):
+        c = 299792.458
+        integrand = lambda zp: 1.0/self.E(zp, w=w)
+        chi = quad(integrand, 0.0, z, limit=200)[0] * c / self.H0
+        return self._curvature(chi)
+
+    def comoving_distance_array(self, z, w=-1.0, ngrid=2048):
+        """comoving_distance for an array of redshifts in one pass.
+
+        1/E is tabulated on a dense grid up to max(z), integrated cumulatively with the
+        trapezoid rule and interpolated at z (relative error ~1e-5 at ngrid=2048).
+        """
+        c = 299792.458
+        z = np.asarray(z, dtype=float)
+        z_grid = np.linspace(0.0, max(float(z.max(initial=0.0)), 1e-8), ngrid)
+        cum = cumulative_trapezoid(1.0/self.E(z_grid, w=w), z_grid, initial=0.0)
+        chi = np.interp(z, z_grid, cum) * c / self.H0
+        return self._curvature(chi)
+
     def angular_diameter_distance(self, z, w=-1.0):
         return self.comoving_distance(z, w=w)/(1+z)
 
     def luminosity_distance(self, z, w=-1.0):
         return (1+z)*self.comoving_distance(z, w=w)
 
+    def luminosity_distance_array(self, z, w=-1.0):
+        z = np.asarray(z, dtype=float)
+        return (1+z)*self.comoving_distance_array(z, w=w)
+
 def w_eff(a, w0=-1.0, wa=0.0):
     """CPL parameterization: w(a) = w0 + wa(1-a)."""
     return w0 + wa*(1.0 - a)
@@ -2,6 +2,7 @@
 import numpy as np
 import warnings
 from .models import LGPDTransfer
+from . import _kernels
 
 def load_baseline_cls(npz_path):
     data = np.load(npz_path)
@@ -17,16 +18,6 @@ def load_baseline_cls(npz_path):
         cls['PP'] = data['clpp']
     return ell, cls
 
-def _ensure_Dl(ell, Cl):
-    """Convert Cl to Dl = ell(ell+1)Cl/2π if needed. We assume Cl here and convert to Dl for modulation."""
-    ell = np.asarray(ell)
-    Cl = np.asarray(Cl)
-    Dl = ell*(ell+1.0)*Cl/(2.0*np.pi)
-    return Dl
-
-def _back_to_Cl(ell, Dl):
-    return (2.0*np.pi)*Dl/(ell*(ell+1.0) + 1e-12)
-
 class CMBSpectra:
     def __init__(self, ell, cls):
         self.ell = np.asarray(ell)
@@ -37,6 +28,77 @@ class CMBSpectra:
         ell, cls = load_baseline_cls(path)
         return cls(ell, cls)
 
+class CMBModulator:
+    """Applies the LGPD + μ/Σ modifications on a fixed ℓ grid.
+
+    Everything that depends only on ℓ (the μ window and the ℓ > 300 lensing mask)
+    is computed once at construction, so repeated calls inside an MCMC loop only pay
+    for the parameter-dependent factors.
+
+    Factors are computed in the floating dtype of ell: pass a float32 ℓ grid (e.g. from
+    DataRepository(dtype=np.float32)) to run the modulation in single precision.
+    """
+    def __init__(self, ell):
+        self.ell = np.asarray(ell)
+        ell = self.ell
+        self.dtype = np.result_type(ell.dtype, np.float32)
+        # μ boosts contrast around peaks (ℓ~100-1500): tanh-windowed factor
+        self.window = (0.5*(1.0 + np.tanh((ell-80)/80)) * (1.0 - np.exp(- (ell/1200.0)**2))).astype(self.dtype, copy=False)
+        # Lensing amplification on TT/EE for ell > ~300
+        self.lens_mask = ell > 300
+
+        self._stack_cache = None  # (keys, stacked Cls)
+
+    def _stacked(self, cls):
+        # The baseline Cls are usually the same values every call; stack them only once.
+        # The check is on values, not identity, so in-place edits of the baseline are seen;
+        # comparing against the cached rows allocates nothing.
+        keys = tuple(cls)
+        cached = self._stack_cache
+        if cached is not None and cached[0] == keys and \
+                all(np.array_equal(cls[key], row) for key, row in zip(keys, cached[1])):
+            return cached[1]
+        src = [np.asarray(cls[key]) for key in keys]
+        dtype = np.result_type(self.dtype, *[a.dtype for a in src])
+        stack = np.ascontiguousarray(np.stack([np.asarray(a, dtype=dtype) for a in src]))
+        self._stack_cache = (keys, stack)
+        return stack
+
+    def apply(self, cls, transfer: LGPDTransfer):
+        """Modified Cls as a dict. For a batched transfer (see LGPDTransfer.batched) every
+        entry has shape (Nbatch, Nell)."""
+        D_env = np.asarray(transfer.Dl_mod_factor(self.ell), dtype=self.dtype)
+        A_L = transfer.lensing_amp()
+        mu_today = transfer.mu_today_large_scales()
+
+        if np.ndim(A_L) == 0 and np.ndim(mu_today) == 0 and np.ndim(D_env) == 1:
+            if _kernels.HAVE_NUMBA:
+                keys = list(cls)
+                stack = self._stacked(cls)
+                lensed = np.array([key in ('TT','EE') for key in keys])
+                out = _kernels.modulate(stack, lensed, self.window, self.lens_mask,
+                                        np.ascontiguousarray(D_env), float(A_L), float(mu_today),
+                                        np.empty_like(stack))
+                return {key: out[k] for k, key in enumerate(keys)}
+            # All factors are multiplicative, so they act on Cl exactly as on Dl and the
+            # Dl <-> Cl round-trip can be skipped. Scalars are cast so they don't promote.
+            A_L = self.dtype.type(A_L)
+            mu_today = self.dtype.type(mu_today)
+            mod = D_env * (1.0 + 0.2*mu_today*self.window)
+            mod_lensed = mod.copy()
+            mod_lensed[self.lens_mask] *= A_L
+        else:
+            # Batched parameters: scalars per sample broadcast against the ℓ axis
+            mu_today = np.asarray(mu_today, dtype=self.dtype)[..., None]
+            A_L = np.asarray(A_L, dtype=self.dtype)[..., None]
+            mod = D_env * (1.0 + 0.2*mu_today*self.window)
+            mod_lensed = mod * np.where(self.lens_mask, A_L, 1.0)
+
+        out = {}
+        for key in cls:
+            out[key] = np.asarray(cls[key]) * (mod_lensed if key in ('TT','EE') else mod)
+        return out
+
 def apply_modifications(ell, cls, transfer: LGPDTransfer):
     """Apply phenomenological LGPD + μ/Σ modifications to baseline Cls.
 
@@ -45,29 +107,9 @@ def apply_modifications(ell, cls, transfer: LGPDTransfer):
     - μ: small-scale driving subtly boosts acoustic contrast (we implement a mild ℓ-dependent factor).
 
     This is intentionally simple and meant for model exploration, not precision.
+    For repeated calls on the same ℓ grid, build a CMBModulator once and use its apply().
     """
-    ell = np.asarray(ell)
-    out = {}
-    D_env = transfer.Dl_mod_factor(ell)
-    A_L = transfer.lensing_amp()
-    mu_today = transfer.mu_today_large_scales()
-
-    def mod_Dl(Dl, kind):
-        # Basic rule: apply envelope; lensing amplification on TT/EE for ell > ~300; μ boosts mid-ℓ contrast
-        Dl_mod = Dl * D_env
-        mask = ell > 300
-        if kind in ('TT','EE'):
-            Dl_mod[mask] *= A_L
-        # μ boosts contrast around peaks (ℓ~100-1500): apply a tanh-windowed factor
-        window = 0.5*(1.0 + np.tanh((ell-80)/80)) * (1.0 - np.exp(- (ell/1200.0)**2))
-        Dl_mod *= (1.0 + 0.2*mu_today*window)
-        return Dl_mod
-
-    for key in cls:
-        Dl = _ensure_Dl(ell, cls[key])
-        Dl_mod = mod_Dl(Dl, key)
-        out[key] = _back_to_Cl(ell, Dl_mod)
-    return out
+    return CMBModulator(ell).apply(cls, transfer)
 
 # Optional CLASS hook (best-effort; no dependency here)
 def get_baseline_cls_from_class(cosmoparams=None, lmax=2500):
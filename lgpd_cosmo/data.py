@@ -1,10 +1,165 @@
 
 import numpy as np
+import json
 import os
+from functools import lru_cache
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+@lru_cache(maxsize=None)
+def _load_csv(path, mtime, dtype=None):
+    # mtime is part of the cache key so edited files are re-read
+    arr = np.loadtxt(path, delimiter=',', skiprows=1, dtype=np.float64, ndmin=2)
+    if dtype is not None:
+        arr = arr.astype(dtype)
+    if arr.shape[1] < 3:
+        raise ValueError(f"{path}: expected at least 3 columns, found {arr.shape[1]}")
+    # Shared between callers through the cache, so hand out read-only arrays
+    arr.flags.writeable = False
+    return arr
+
+def _save_atomic(path, write):
+    # Write to a temporary name and rename, so concurrent readers never see a partial file
+    tmp = f"{path}.tmp{os.getpid()}"
+    try:
+        with open(tmp, 'wb' if path.endswith('.npy') else 'w') as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def _first_key(data, keys):
+    return next((k for k in keys if k in data.files), None)
+
+def _read_npz_chain(chain_file, dtype):
+    with np.load(chain_file) as data:
+        key = _first_key(data, ('samples', 'chain'))
+        if key is None:
+            raise KeyError(f"{chain_file}: no 'samples' or 'chain' array")
+        samples = data[key] if dtype is None else data[key].astype(dtype)
+        logp_key = _first_key(data, ('log_prob', 'logprob'))
+        log_prob = None if logp_key is None else data[logp_key]
+        names = [str(n) for n in data['param_names']] if 'param_names' in data.files else None
+    return samples, names, log_prob
+
+def _ensure_mmap_chain(chain_file, dtype):
+    """Paths of the mmap-able copies of a posterior NPZ, (re)converting them if missing or stale.
+
+    The JSON sidecar records the (size, mtime_ns) of the NPZ it was converted from, and the
+    copies count as fresh only while the NPZ still matches it exactly, so an archive
+    replaced by an older file (cp -p, rsync, restore) is converted again.
+    """
+    cache_dir = os.path.join(os.path.dirname(chain_file), '.cache')
+    stem = os.path.join(cache_dir, os.path.splitext(os.path.basename(chain_file))[0])
+    tag = 'stored' if dtype is None else np.dtype(dtype).name
+    samples_path, logp_path, meta_path = (stem + f'_{tag}.npy', stem + f'_{tag}_log_prob.npy',
+                                          stem + f'_{tag}.json')
+    st = os.stat(chain_file)
+    source = [st.st_size, st.st_mtime_ns]
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get('source') == source and os.path.exists(samples_path):
+            return samples_path, logp_path if meta['has_log_prob'] else None, meta['param_names']
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+    samples, names, log_prob = _read_npz_chain(chain_file, dtype)
+    os.makedirs(cache_dir, exist_ok=True)
+    _save_atomic(samples_path, lambda f: np.save(f, samples))
+    if log_prob is not None:
+        _save_atomic(logp_path, lambda f: np.save(f, log_prob))
+    # written last: a sidecar matching the NPZ marks a complete conversion
+    meta = {'source': source, 'param_names': names, 'has_log_prob': log_prob is not None}
+    _save_atomic(meta_path, lambda f: json.dump(meta, f))
+    return samples_path, logp_path if log_prob is not None else None, names
+
+def load_posterior_chain(chain_file, dtype=np.float32):
+    """(samples, param_names, log_prob) from a posterior NPZ such as outputs/posterior_chain.npz.
+
+    Samples are read from 'samples' or 'chain', log_prob from 'log_prob' or 'logprob';
+    log_prob and param_names are None when the archive has no such member.
+
+    The NPZ is converted once into samples and log_prob .npy files plus a JSON sidecar in a
+    .cache/ directory beside it (again whenever the NPZ changes), so the derived files stay
+    out of the tracked outputs. Those are opened memory-mapped and read-only, so repeated
+    script runs are served from the page cache instead of re-reading the archive. If the
+    cache cannot be written (read-only or shared data directory), the NPZ is read directly.
+    Samples are cast to dtype; float32 is ample for medians and percentile bands, and
+    dtype=None keeps them as stored.
+    """
+    chain_file = os.fspath(chain_file)
+    try:
+        samples_path, logp_path, param_names = _ensure_mmap_chain(chain_file, dtype)
+    except OSError:
+        samples, param_names, log_prob = _read_npz_chain(chain_file, dtype)
+        return samples, param_names, log_prob
+    log_prob = None if logp_path is None else np.load(logp_path, mmap_mode='r')
+    return np.load(samples_path, mmap_mode='r'), param_names, log_prob
+
+def _tolist(o):
+    o = np.asarray(o)
+    if o.dtype.kind == 'f' and o.dtype.itemsize < 8:
+        # shortest repr in the array's own precision (0.1, not 0.10000000149011612), as orjson does
+        o = o.astype(str).astype(np.float64)
+    return o.tolist()
+
+def _json_default(o):
+    if isinstance(o, (np.ndarray, np.generic)):
+        return _tolist(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+def _json_plain(obj, nan_to_none):
+    # numpy scalar dict keys become Python ones (neither backend accepts them); for the
+    # stdlib backend arrays are also unpacked and non-finite floats mapped to None
+    if isinstance(obj, dict):
+        return {(k.item() if isinstance(k, np.generic) else k): _json_plain(v, nan_to_none)
+                for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_json_plain(v, nan_to_none) for v in obj]
+    if nan_to_none:
+        if isinstance(obj, (np.ndarray, np.generic)):
+            return _json_plain(_tolist(obj), nan_to_none)
+        if isinstance(obj, float) and not np.isfinite(obj):
+            return None
+    return obj
+
+def save_json(path, obj):
+    """Write obj as 2-space indented JSON; numpy arrays and scalars may appear anywhere in it.
+
+    Uses orjson when it is installed (arrays are serialized natively, without .tolist()
+    copies), otherwise the stdlib json module. Both write NaN and inf as null, write
+    float16/float32 values in their shortest repr and accept the same non-str keys, so the
+    output does not depend on which one is present.
+    """
+    if orjson is not None:
+        # non-contiguous or unsupported arrays fall through to _json_default
+        data = orjson.dumps(_json_plain(obj, False), default=_json_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2)
+        with open(path, 'wb') as f:
+            f.write(data)
+    else:
+        with open(path, 'w') as f:
+            json.dump(_json_plain(obj, True), f, indent=2, allow_nan=False)
 
 class DataRepository:
-    def __init__(self, root='data'):
+    """Loads the bundled datasets from root.
+
+    dtype: optional floating type (e.g. np.float32) that all loaded arrays, including ℓ,
+    are cast to. Single precision halves the memory traffic of the CMB modulation; Planck
+    bin errors are at the percent level, and the likelihoods accumulate chi2 in float64.
+    The default (None) keeps arrays as stored.
+    """
+    def __init__(self, root='data', dtype=None):
         self.root = root
+        self.dtype = None if dtype is None else np.dtype(dtype)
+
+    def _cast(self, arr):
+        return arr if self.dtype is None else np.asarray(arr, dtype=self.dtype)
 
     def path(self, name):
         return os.path.join(self.root, name)
@@ -14,29 +169,31 @@ class DataRepository:
         if not os.path.exists(p):
             raise FileNotFoundError(f"Missing {p}. See README for expected format.")
         data = np.load(p)
-        return data['ell'], {
-            'TT': data['cltt'],
-            'TE': data['clte'],
-            'EE': data['clee']
+        return self._cast(data['ell']), {
+            'TT': self._cast(data['cltt']),
+            'TE': self._cast(data['clte']),
+            'EE': self._cast(data['clee'])
         }
 
+    def _csv(self, filename):
+        # Parsed once per (path, mtime); the cached array is shared and read-only, so the
+        # public loaders below hand out copies
+        p = os.path.abspath(self.path(filename))
+        return _load_csv(p, os.path.getmtime(p), None if self.dtype is None else self.dtype.str)
+
     def load_simple_binned(self, filename):
-        p = self.path(filename)
-        arr = np.loadtxt(p, delimiter=',', skiprows=1)
+        arr = self._csv(filename).copy()
         # Expect columns [ell, Dl, sigma]
         return arr[:,0], arr[:,1], arr[:,2]
 
     def load_bao(self, filename):
         # Expect columns [z, DV_over_rd, sigma]
-        arr = np.loadtxt(self.path(filename), delimiter=',', skiprows=1)
-        return arr
+        return self._csv(filename).copy()
 
     def load_sne(self, filename):
         # Expect columns [z, mu, sigma]
-        arr = np.loadtxt(self.path(filename), delimiter=',', skiprows=1)
-        return arr
+        return self._csv(filename).copy()
 
     def load_growth(self, filename):
         # Expect columns [z, fsigma8, sigma]
-        arr = np.loadtxt(self.path(filename), delimiter=',', skiprows=1)
-        return arr
+        return self._csv(filename).copy()
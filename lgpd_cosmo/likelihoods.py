@@ -1,5 +1,63 @@
 
 import numpy as np
+from . import _kernels
+
+def precompute_interp(ells, ells_model):
+    """Linear-interpolation indices/weights mapping the model grid onto fixed ells.
+
+    Returns (idx, w) such that model(ells) = Dl_model[idx]*(1-w) + Dl_model[idx+1]*w,
+    which matches np.interp for ells inside the model range.
+    """
+    ells = np.asarray(ells, dtype=float)
+    ells_model = np.asarray(ells_model, dtype=float)
+    N = len(ells_model)
+    if ells_model.ndim != 1 or N < 2:
+        raise ValueError(f"model ell grid needs at least 2 points, got shape {ells_model.shape}")
+    if np.any(np.diff(ells_model) <= 0):
+        raise ValueError("model ell grid must be strictly increasing")
+    idx = np.clip(np.searchsorted(ells_model, ells) - 1, 0, N - 2)
+    w = (ells - ells_model[idx]) / (ells_model[idx+1] - ells_model[idx])
+    return idx, w
+
+class PlanckBinnedLike:
+    """Binned Dl data with interpolation weights onto a fixed model ℓ grid.
+
+    Built once outside the MCMC loop; Likelihoods.add_planck_binned then only needs
+    a gather and a multiply-add per step instead of a fresh np.interp.
+
+    prefactor: optional per-ℓ factor on the model grid (e.g. ℓ(ℓ+1)/2π) folded into the
+    weights, so the model can be passed as Cl without a full-grid conversion per step.
+    """
+    def __init__(self, ells, Dl_data, sigma, ells_model, prefactor=None):
+        ells = np.asarray(ells, dtype=float)
+        sigma = np.asarray(sigma, dtype=float)
+        ells_model = np.asarray(ells_model)
+        # Same masking as add_planck_simple: bins outside the model range or with sigma <= 0 are dropped
+        mask = (ells >= ells_model[0]) & (ells <= ells_model[-1]) & (sigma > 0)
+        self.ells = ells[mask]
+        self.Dl_data = np.asarray(Dl_data, dtype=float)[mask]
+        self.inv_sigma = 1.0 / sigma[mask]
+        self.mask = mask
+        self.idx, w = precompute_interp(self.ells, ells_model)
+        self.w_lo = 1.0 - w
+        self.w_hi = w
+        if prefactor is not None:
+            prefactor = np.asarray(prefactor, dtype=float)
+            self.w_lo = self.w_lo * prefactor[self.idx]
+            self.w_hi = self.w_hi * prefactor[self.idx+1]
+
+    def model_at_bins(self, model):
+        # Gathers along the last axis, so a (Nbatch, Nell) stack of models also works
+        return model[..., self.idx]*self.w_lo + model[..., self.idx+1]*self.w_hi
+
+    def chi2(self, model):
+        """chi2 as a float, or an (Nbatch,) array for a batched (Nbatch, Nell) model."""
+        if _kernels.HAVE_NUMBA and np.ndim(model) == 1:
+            return float(_kernels.chi2_interp(self.idx, self.w_lo, self.w_hi, self.inv_sigma,
+                                              self.Dl_data, np.asarray(model)))
+        r = (self.Dl_data - self.model_at_bins(model)) * self.inv_sigma
+        chi2 = np.einsum('...i,...i->...', r, r)
+        return float(chi2) if chi2.ndim == 0 else chi2
 
 class Likelihoods:
     def __init__(self):
@@ -10,16 +68,25 @@ class Likelihoods:
         model_interp = np.interp(ells, ells_model, Dl_model, left=np.nan, right=np.nan)
         mask = np.isfinite(model_interp) & (sigma > 0)
         resid = (Dl_data[mask] - model_interp[mask]) / sigma[mask]
-        chi2 = np.sum(resid**2)
+        chi2 = float(resid @ resid)
         self.parts.append(('PlanckSimple', chi2, mask.sum()))
         return chi2
 
+    def add_planck_binned(self, like: PlanckBinnedLike, model):
+        """Same chi2 as add_planck_simple, using weights precomputed in a PlanckBinnedLike.
+
+        model is Dl on the model grid, or Cl if the PlanckBinnedLike was built with a prefactor.
+        """
+        chi2 = like.chi2(model)
+        self.parts.append(('PlanckSimple', chi2, int(like.mask.sum())))
+        return chi2
+
     def add_bao(self, bao_data, DV_over_rd_model):
         # bao_data: columns z, DV/rd, sigma ; model must be interpolated or computed at those z
         z = bao_data[:,0]; obs = bao_data[:,1]; sig = bao_data[:,2]
         model = DV_over_rd_model(z)
         resid = (obs - model)/sig
-        chi2 = float(np.sum(resid**2))
+        chi2 = float(resid @ resid)
         self.parts.append(('BAO', chi2, len(z)))
         return chi2
 
@@ -27,7 +94,7 @@ class Likelihoods:
         z = sne_data[:,0]; obs = sne_data[:,1]; sig = sne_data[:,2]
         model = mu_model(z)
         resid = (obs - model)/sig
-        chi2 = float(np.sum(resid**2))
+        chi2 = float(resid @ resid)
         self.parts.append(('SNe', chi2, len(z)))
         return chi2
 
@@ -35,7 +102,7 @@ class Likelihoods:
         z = growth_data[:,0]; obs = growth_data[:,1]; sig = growth_data[:,2]
         model = fs8_model(z)
         resid = (obs - model)/sig
-        chi2 = float(np.sum(resid**2))
+        chi2 = float(resid @ resid)
         self.parts.append(('Growth', chi2, len(z)))
         return chi2
 
@@ -1,6 +1,6 @@
 
 import numpy as np
-from scipy.integrate import odeint
+from scipy.integrate import solve_ivp
 
 class GrowthModel:
     """Solve linear growth D(a) with optional μ(a) modification to effective G.
@@ -29,44 +29,47 @@ class GrowthModel:
         return -0.5*(1+3*w*Ode)
 
     def solve(self, a_array, w=-1.0):
-        a_array = np.asarray(a_array)
+        a_array = np.asarray(a_array, dtype=float)
         a_array = np.sort(a_array)
+        # initial conditions deep in matter era: every a below 1e-4 is floored there, not only
+        # the first, so the whole grid lies inside the integration span
+        a_vals = np.maximum(a_array, 1e-4)
+        a_init = a_vals[0]
+        y0 = [a_init, 1.0]  # growing mode ~ a
+        # solve_ivp needs a strictly increasing t_eval; repeated (or floored) points share a solution
+        a_eval, inv = np.unique(a_vals, return_inverse=True)
+        if len(a_eval) == 1:
+            return a_vals, np.ones(len(a_vals))
+
         # State vector y = [D, D']
-        def deriv(y, a):
+        def rhs(a, y):
             D, Dp = y
             mu = self.mu_of_a_fn(a)
-            E = self.E(a, w=w)
             dlnH = self.dlnH_dlna(a, w=w)
             Om = self.Om_a(a)
             Dpp = - ( (3.0/a) + dlnH ) * Dp + 1.5 * Om * (1+mu) * D / (a*a)
             return [Dp, Dpp]
 
-        # initial conditions deep in matter era
-        a_init = a_array[0] if a_array[0] > 1e-4 else 1e-4
-        y0 = [a_init, 1.0]  # growing mode ~ a
-        sol = [y0]
-        a_vals = [a_init]
-        for ai in a_array[1:]:
-            # integrate with simple Euler or small steps ODE - to avoid ODEINT complexities in notebook environment
-            a_prev = a_vals[-1]
-            y_prev = sol[-1]
-            steps = max(5, int( (ai - a_prev)/1e-3 ))
-            da = (ai - a_prev)/steps
-            y = y_prev[:]
-            a = a_prev
-            for _ in range(steps):
-                k1 = deriv(y, a)
-                y_mid = [y[0]+0.5*da*k1[0], y[1]+0.5*da*k1[1]]
-                k2 = deriv(y_mid, a+0.5*da)
-                y = [y[0] + da*k2[0], y[1] + da*k2[1]]
-                a += da
-            sol.append(y)
-            a_vals.append(ai)
-        D = np.array([s[0] for s in sol])
+        sol = solve_ivp(rhs, (a_eval[0], a_eval[-1]), y0, t_eval=a_eval,
+                        method='LSODA', rtol=1e-6, atol=1e-9)
+        if not sol.success:
+            raise RuntimeError(f"Growth ODE integration failed: {sol.message}")
+        D = sol.y[0][inv]
         # Normalize D(a=1)=1
         D /= D[-1]
         return a_vals, D
 
+    def growth_on_grid(self, a_grid, w=-1.0):
+        """D(a) and f(a) = d ln D / d ln a from one ODE solve over a_grid.
+
+        Returns (a_vals, D, f); callers interpolate these onto the scale factors they need.
+        """
+        a_vals, D = self.solve(a_grid, w=w)
+        a_vals = np.asarray(a_vals)
+        lnD = np.log(np.maximum(D, 1e-12))
+        lna = np.log(np.maximum(a_vals, 1e-8))
+        return a_vals, D, np.gradient(lnD, lna)
+
     def fsigma8(self, z_array, sigma8_0=0.8):
         """Compute fσ8(z) given a present-day normalization σ8_0.
 
@@ -76,14 +79,8 @@ class GrowthModel:
         """
         z = np.asarray(z_array)
         a = 1.0/(1.0+z)
-        a_sorted = np.linspace(a.min()*0.99, 1.0, 800)
-        a_vals, D = self.solve(a_sorted)
-        a_vals = np.asarray(a_vals)
-        # f = d ln D / d ln a
-        lnD = np.log(np.maximum(D, 1e-12))
-        lna = np.log(np.maximum(a_vals, 1e-8))
-        dlnD_dlna = np.gradient(lnD, lna)
-        f_interp = np.interp(a, a_vals, dlnD_dlna)
+        a_vals, D, f = self.growth_on_grid(np.linspace(a.min()*0.99, 1.0, 800))
+        f_interp = np.interp(a, a_vals, f)
         D_interp = np.interp(a, a_vals, D)
         return f_interp * sigma8_0 * D_interp
 
@@ -96,11 +93,8 @@ class GrowthModel:
         """
         z = np.asarray(z_array)
         a = 1.0/(1.0+z)
-        # reuse f from fsigma8 with σ8_0 normalized out
-        a_sorted = np.linspace(a.min()*0.99, 1.0, 800)
-        a_vals, D = self.solve(a_sorted)
-        lnD = np.log(np.maximum(D, 1e-12))
-        lna = np.log(np.maximum(a_vals, 1e-8))
-        f = np.interp(a, a_vals, np.gradient(lnD, lna))
-        Om_a = np.array([self.Om_a(ai) for ai in a])
+        # same grid and growth solution as fsigma8, with σ8_0 normalized out
+        a_vals, _, f_grid = self.growth_on_grid(np.linspace(a.min()*0.99, 1.0, 800))
+        f = np.interp(a, a_vals, f_grid)
+        Om_a = self.Om_a(a)
         return Om_a * (1.0 + Sigma_eff) / np.maximum(f, 1e-6)
@@ -1,14 +1,74 @@
 
 import numpy as np
 import warnings
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 
-def lnprior(theta, priors):
-    for val, (lo, hi) in zip(theta, priors):
-        if not (lo <= val <= hi):
-            return -np.inf
-    return 0.0
+def prior_bounds(priors):
+    """Split [(lo, hi), ...] box priors into (lo, hi) bound arrays."""
+    bounds = np.asarray(priors, dtype=float).reshape(-1, 2)
+    return bounds[:, 0], bounds[:, 1]
 
-def run_emcee(loglike_fn, theta0, priors, nwalkers=24, nsteps=500, nburn=200, rng=None):
+def lnprior(theta, priors, bounds=None):
+    """Flat box prior. Pass bounds=prior_bounds(priors) to skip rebuilding the arrays per call."""
+    lo, hi = prior_bounds(priors) if bounds is None else bounds
+    theta = np.asarray(theta)
+    return 0.0 if np.all((theta >= lo) & (theta <= hi)) else -np.inf
+
+def _make_lnprior(priors):
+    """lnprior(theta) for fixed priors, with the bound arrays built once.
+
+    A partial rather than a closure, so it still pickles for emcee pools.
+    """
+    return partial(lnprior, priors=priors, bounds=prior_bounds(priors))
+
+def _lnprob(p, lnprior_fn, loglike_fn):
+    # Module-level so that it pickles cleanly when emcee dispatches walkers to a pool.
+    lp = lnprior_fn(p)
+    if not np.isfinite(lp):
+        return -np.inf
+    ll = loglike_fn(p)
+    return lp + ll
+
+def _lnprob_vec(P, priors, loglike_fn, bounds=None):
+    # Batched counterpart of _lnprob for emcee's vectorize=True: P has shape (n, ndim)
+    lo, hi = prior_bounds(priors) if bounds is None else bounds
+    inside = np.all((P >= lo) & (P <= hi), axis=1)
+    out = np.full(len(P), -np.inf)
+    # Only rows inside the prior reach the likelihood
+    if inside.any():
+        out[inside] = np.asarray(loglike_fn(P[inside]), dtype=float).reshape(-1)
+    return out
+
+# Samplers kept for reuse across run_emcee(..., reuse_sampler=True) calls, keyed by
+# (nwalkers, ndim, id(loglike_fn), priors, vectorize). The cached sampler holds a reference to
+# loglike_fn, so its id cannot be recycled while the entry exists.
+_sampler_cache = {}
+
+def run_emcee(loglike_fn, theta0, priors, nwalkers=24, nsteps=500, nburn=200, rng=None, pool=None,
+              threads=None, reuse_sampler=False, vectorize=False, n_jobs=1):
+    """Sample the posterior with emcee (or a crude prior scan if emcee is missing).
+
+    pool: optional object with a ``map`` method (e.g. ``multiprocessing.Pool``, or
+    ``schwimmbad.MPIPool`` across nodes) used by emcee to evaluate the half-ensemble in
+    parallel. ``loglike_fn`` must then be picklable, i.e. a module-level function or a
+    ``functools.partial`` of one, not a local closure.
+    threads: if set and no pool is given, evaluate walkers on a ThreadPoolExecutor with this
+    many workers. No pickling is involved, so closures work; it pays off when the likelihood
+    spends its time in GIL-releasing code (the numba kernels in lgpd_cosmo._kernels, large
+    NumPy operations).
+    reuse_sampler: reuse (after reset()) the sampler from an earlier call with the same
+    walkers, dimension, likelihood and priors instead of building a new one. Off by default
+    because the returned sampler is then shared: a later call resets its chain.
+    vectorize: loglike_fn takes an (n, ndim) array of parameter vectors and returns n
+    log-likelihoods, so a whole batch of walkers is evaluated in one call. Rows outside the
+    prior are dropped before the call, so n can be below nwalkers//2; a batch with no
+    row inside the prior skips the call. emcee ignores pool in this mode.
+    n_jobs: worker processes for the prior scan used when emcee is missing (joblib/loky,
+    -1 = all cores; loglike_fn must pickle, which loky's cloudpickle does for closures too).
+    Ignored when emcee is available or joblib is not installed.
+    """
+    bounds = prior_bounds(priors)
     try:
         import emcee
     except Exception:
@@ -16,29 +76,58 @@ def run_emcee(loglike_fn, theta0, priors, nwalkers=24, nsteps=500, nburn=200, rn
         rng = np.random.default_rng() if rng is None else rng
         ndim = len(theta0)
         N = max(nwalkers*nsteps//2, 2000)
-        chain = []
-        lnp = []
-        for _ in range(N):
-            theta = np.array([rng.uniform(lo, hi) for (lo,hi) in priors])
-            lp = lnprior(theta, priors)
-            if not np.isfinite(lp):
-                continue
-            ll = loglike_fn(theta)
-            chain.append(theta)
-            lnp.append(lp + ll)
-        return np.array(chain), np.array(lnp)
+        lo, hi = bounds
+        # Draws come straight from the box prior, so lnprior is 0 for every row
+        chain = rng.uniform(lo, hi, size=(N, ndim))
+        # Batches of the size emcee would pass, so batched models don't allocate (N, Nell) stacks
+        step = max(nwalkers//2, 1)
+        parallel = None
+        if n_jobs != 1:
+            try:
+                from joblib import Parallel, delayed
+                parallel = Parallel(n_jobs=n_jobs, backend='loky', batch_size='auto')
+            except Exception:
+                warnings.warn("joblib not available; running the prior scan serially")
+        if parallel is not None:
+            if vectorize:
+                parts = parallel(delayed(loglike_fn)(chain[i:i+step]) for i in range(0, N, step))
+                lnp = np.concatenate([np.asarray(p, dtype=float).reshape(-1) for p in parts])
+            else:
+                lnp = np.asarray(parallel(delayed(loglike_fn)(theta) for theta in chain), dtype=float)
+        elif vectorize:
+            lnp = np.concatenate([np.asarray(loglike_fn(chain[i:i+step]), dtype=float).reshape(-1)
+                                  for i in range(0, N, step)])
+        else:
+            lnp = np.fromiter((loglike_fn(theta) for theta in chain), dtype=float, count=N)
+        return chain, lnp
 
     rng = np.random.default_rng() if rng is None else rng
     ndim = len(theta0)
     p0 = theta0 + 1e-3*rng.normal(size=(nwalkers, ndim))
-    def lnprob(p):
-        lp = lnprior(p, priors)
-        if not np.isfinite(lp):
-            return -np.inf
-        ll = loglike_fn(p)
-        return lp + ll
-    sampler = emcee.EnsembleSampler(nwalkers, ndim, lnprob)
-    sampler.run_mcmc(p0, nsteps, progress=False)
+    if vectorize:
+        lnprob = partial(_lnprob_vec, priors=priors, loglike_fn=loglike_fn, bounds=bounds)
+    else:
+        lnprob = partial(_lnprob, lnprior_fn=_make_lnprior(priors), loglike_fn=loglike_fn)
+    executor = ThreadPoolExecutor(max_workers=threads) if (threads and pool is None) else None
+    key = (nwalkers, ndim, id(loglike_fn), tuple(map(tuple, np.asarray(priors, dtype=float))), vectorize)
+    sampler = None
+    try:
+        sampler = _sampler_cache.get(key) if reuse_sampler else None
+        if sampler is None:
+            sampler = emcee.EnsembleSampler(nwalkers, ndim, lnprob, pool=pool if executor is None else executor,
+                                            vectorize=vectorize)
+            if reuse_sampler:
+                _sampler_cache[key] = sampler
+        else:
+            sampler.reset()
+            sampler.pool = pool if executor is None else executor
+        sampler.run_mcmc(p0, nsteps, progress=False)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+            # Don't leave the returned (or cached) sampler pointing at a dead executor
+            if sampler is not None:
+                sampler.pool = pool
     chain = sampler.get_chain(discard=nburn, flat=True)
     lnp = sampler.get_log_prob(discard=nburn, flat=True)
     return chain, lnp, sampler
@@ -68,15 +157,18 @@ def compute_gelman_rubin(chains_list):
     N = min(c.shape[0] for c in chains_list)
     ndim = chains_list[0].shape[1]
     
-    # Trim all chains to same length
-    chains = np.array([c[:N, :] for c in chains_list])  # (M, N, ndim)
+    # Per-chain summaries of the first N samples; the chains are never stacked into (M, N, ndim)
+    chain_means = np.empty((M, ndim))  # (M, ndim)
+    chain_vars = np.empty((M, ndim))
+    for j, c in enumerate(chains_list):
+        cj = c[:N, :]
+        chain_means[j] = cj.mean(axis=0)
+        chain_vars[j] = cj.var(axis=0, ddof=1)
     
     # Within-chain variance
-    W = np.mean(np.var(chains, axis=1, ddof=1), axis=0)
+    W = np.mean(chain_vars, axis=0)
     
     # Between-chain variance
-    chain_means = np.mean(chains, axis=1)  # (M, ndim)
-    grand_mean = np.mean(chain_means, axis=0)  # (ndim,)
     B = N * np.var(chain_means, axis=0, ddof=1)
     
     # Pooled variance estimate
@@ -1,4 +1,5 @@
 
+from functools import lru_cache
 import numpy as np
 
 class LGPDParams:
@@ -65,13 +66,116 @@ class ThreadbareParams:
         self.zt = zt
         self.n = n
 
+class _BatchMixin:
+    """Structure-of-arrays variant of a parameter class: the amplitude that varies across
+    walkers/samples is an (Nbatch,) array, the shape parameters stay shared scalars."""
+    _batched = ()
+
+    @classmethod
+    def from_params(cls, pars, **columns):
+        """Batch sharing the shape parameters of pars, with the given (Nbatch,) columns."""
+        obj = cls.__new__(cls)
+        obj.__dict__.update(vars(pars))
+        for name in cls._batched:
+            setattr(obj, name, np.asarray(columns.get(name, getattr(pars, name)), dtype=float).reshape(-1))
+        return obj
+
+    def __len__(self):
+        return len(getattr(self, self._batched[0]))
+
+class LGPDParamsBatch(_BatchMixin, LGPDParams):
+    """LGPDParams with xi_damp as an (Nbatch,) array."""
+    _batched = ('xi_damp',)
+
+    def __init__(self, xi_damp, **kwargs):
+        super().__init__(xi_damp=np.asarray(xi_damp, dtype=float).reshape(-1), **kwargs)
+
+class CondensateParamsBatch(_BatchMixin, CondensateParams):
+    """CondensateParams with mu0 as an (Nbatch,) array."""
+    _batched = ('mu0',)
+
+    def __init__(self, mu0, **kwargs):
+        super().__init__(mu0=np.asarray(mu0, dtype=float).reshape(-1), **kwargs)
+
+class ElasticityParamsBatch(_BatchMixin, ElasticityParams):
+    """ElasticityParams with sigma0 as an (Nbatch,) array."""
+    _batched = ('sigma0',)
+
+    def __init__(self, sigma0, **kwargs):
+        super().__init__(sigma0=np.asarray(sigma0, dtype=float).reshape(-1), **kwargs)
+
 def S_of_z(z, zt, n):
     return 1.0 / (1.0 + ((1.0 + z)/(1.0 + zt))**n)
 
+# The (k, z) shape factors of μ and Σ depend only on fixed parameters, and fits evaluate
+# them on the same k/z values over and over, so they are memoized. Arrays are keyed by
+# their bytes, which only pays off for small grids; larger ones are computed directly.
+_MEMO_MAX_SIZE = 4096
+
+def _memo_key(x):
+    if np.ndim(x) == 0:
+        return float(x)
+    x = np.asarray(x)
+    return (x.dtype.str, x.shape, x.tobytes())
+
+def _from_key(key):
+    if isinstance(key, float):
+        return key
+    dtype, shape, buf = key
+    return np.frombuffer(buf, dtype=dtype).reshape(shape)
+
+def _readonly(out):
+    if isinstance(out, np.ndarray):
+        out.setflags(write=False)
+    return out
+
+@lru_cache(maxsize=64)
+def _scale_cached(k_key, k0, m):
+    return _readonly(1.0 / (1.0 + (_from_key(k_key)/k0)**(-m)))
+
+@lru_cache(maxsize=64)
+def _Sz_cached(z_key, zt, n):
+    return _readonly(S_of_z(_from_key(z_key), zt, n))
+
+def _memoizable(x, *pars):
+    return np.size(x) <= _MEMO_MAX_SIZE and all(np.ndim(p) == 0 for p in pars)
+
+def _inplace(x, *pars):
+    # Large arrays with scalar parameters: evaluate in a single scratch buffer
+    return isinstance(x, np.ndarray) and x.ndim > 0 and all(np.ndim(p) == 0 for p in pars)
+
+def _scale(k, k0, m):
+    """1/(1 + (k/k0)^-m), memoized on (k, k0, m)."""
+    if _memoizable(k, k0, m):
+        return _scale_cached(_memo_key(k), float(k0), float(m))
+    if _inplace(k, k0, m):
+        t = np.divide(k, k0, dtype=float)
+        np.power(t, -m, out=t)
+        t += 1.0
+        return np.reciprocal(t, out=t)
+    return 1.0 / (1.0 + (k/k0)**(-m))
+
+def _Sz(z, zt, n):
+    """S_of_z(z, zt, n), memoized on (z, zt, n)."""
+    if _memoizable(z, zt, n):
+        return _Sz_cached(_memo_key(z), float(zt), float(n))
+    if _inplace(z, zt, n):
+        t = np.add(z, 1.0, dtype=float)
+        t /= 1.0 + zt
+        np.power(t, n, out=t)
+        t += 1.0
+        return np.reciprocal(t, out=t)
+    return S_of_z(z, zt, n)
+
 def mu_kz(k, z, pars: CondensateParams):
     """Scale- and redshift-dependent modification to Newtonian potential Φ → (1+μ)Φ."""
-    scale = 1.0 / (1.0 + (k/pars.k0)**(-pars.m))
-    return pars.mu0 * scale * S_of_z(z, pars.zt, pars.n)
+    return pars.mu0 * _scale(k, pars.k0, pars.m) * _Sz(z, pars.zt, pars.n)
+
+def _fill_split(z, z_split, low, high):
+    # Piecewise-constant value in z: fill with high, then overwrite z <= z_split with low
+    out = np.full(np.shape(z), high, dtype=float)
+    out[z <= z_split] = low
+    return out
 
 def mu_kz_binned(k, z, pars: 'CondensateParamsBinned'):
     """Two-bin μ(k,z) using piecewise-constant amplitude in redshift, with k scaling.
@@ -81,9 +185,13 @@ def mu_kz_binned(k, z, pars: 'CondensateParamsBinned'):
     - This is a phenomenological parameterization intended for trend testing.
     """
     z = np.asarray(z)
-    scale = 1.0 / (1.0 + (np.asarray(k)/pars.k0)**(-pars.m))
-    amp = np.where(z <= pars.z_split, pars.mu_low, pars.mu_high)
-    return amp * scale
+    scale = _scale(np.asarray(k), pars.k0, pars.m)
+    if np.ndim(pars.mu_low) or np.ndim(pars.mu_high):
+        return np.where(z <= pars.z_split, pars.mu_low, pars.mu_high) * scale
+    if np.ndim(scale) == 0:
+        # Fold the scalar scale into the fill values
+        return _fill_split(z, pars.z_split, pars.mu_low*scale, pars.mu_high*scale)[()]
+    return _fill_split(z, pars.z_split, pars.mu_low, pars.mu_high) * scale
 
 # Helper for growth-only usage (μ(a) without k)
 # This maps a -> μ(a) corresponding to the binned redshift model
@@ -92,24 +200,80 @@ def mu_kz_binned(k, z, pars: 'CondensateParamsBinned'):
 def mu_of_a_binned(a, pars: 'CondensateParamsBinned'):
     a = np.asarray(a)
     z = 1.0/np.maximum(a, 1e-8) - 1.0
-    return np.where(z <= pars.z_split, pars.mu_low, pars.mu_high)
+    if np.ndim(pars.mu_low) or np.ndim(pars.mu_high):
+        return np.where(z <= pars.z_split, pars.mu_low, pars.mu_high)
+    return _fill_split(z, pars.z_split, pars.mu_low, pars.mu_high)
 
 def sigma_kz(k, z, pars: ElasticityParams):
-    scale = 1.0 / (1.0 + (k/pars.k0)**(-pars.m))
-    return pars.sigma0 * scale * S_of_z(z, pars.zt, pars.n)
+    return pars.sigma0 * _scale(k, pars.k0, pars.m) * _Sz(z, pars.zt, pars.n)
+
+def _batch_outer(amp, k, z, k0, m, zt, n):
+    # (Nbatch,) amplitude times the shared (k, z) shape -> (Nbatch,) + broadcast(k, z).shape
+    shape = np.asarray(_scale(k, k0, m) * _Sz(z, zt, n))
+    return np.multiply.outer(amp, shape)
+
+def mu_kz_batch(k, z, pars: CondensateParamsBatch):
+    """mu_kz for every row of a CondensateParamsBatch: shape (Nbatch,) + broadcast(k, z).shape."""
+    return _batch_outer(pars.mu0, k, z, pars.k0, pars.m, pars.zt, pars.n)
+
+def sigma_kz_batch(k, z, pars: ElasticityParamsBatch):
+    """sigma_kz for every row of an ElasticityParamsBatch: shape (Nbatch,) + broadcast(k, z).shape."""
+    return _batch_outer(pars.sigma0, k, z, pars.k0, pars.m, pars.zt, pars.n)
 
 def coherence_length(z, pars: ThreadbareParams):
     return pars.lc0 * (1.0 + z)**(-pars.nu) * S_of_z(z, pars.zt, pars.n)
 
+@lru_cache(maxsize=16)
+def _damping_cached(ell_key, ell_d):
+    e = _from_key(ell_key)
+    return _readonly(e*(e+1.0) / (ell_d**2))
+
+def _damping_shape(ell, ell_d=1500.0):
+    """ell(ell+1)/ell_d^2, memoized on the ell values (fits pass the same grid every step)."""
+    if np.size(ell) <= _MEMO_MAX_SIZE:
+        return _damping_cached(_memo_key(ell), float(ell_d))
+    e = np.asarray(ell)
+    return e*(e+1.0) / (ell_d**2)
+
+def _gamma_direct(a, log10_Gamma0, a_star, p):
+    Gamma0 = 10.0**log10_Gamma0
+    if _inplace(a, Gamma0, a_star, p):
+        a2s = a_star**2
+        r = np.multiply(a, a, dtype=float)
+        r += a2s
+        np.divide(a2s, r, out=r)
+        np.power(r, p, out=r)
+        r *= Gamma0
+        return r
+    return Gamma0 * ( (a_star**2) / (a*a + a_star**2) )**p
+
+@lru_cache(maxsize=128)
+def _gamma_cached(a_key, log10_Gamma0, a_star, p):
+    return _readonly(_gamma_direct(_from_key(a_key), log10_Gamma0, a_star, p))
+
 def gamma_of_a(a, pars: LGPDParams):
     """Decoherence rate Γ(a) with a low-gravity trigger around a_star.
-    a ~ 1/(1+z). """
-    Gamma0 = 10.0**pars.log10_Gamma0
-    return Gamma0 * ( (pars.a_star**2) / (a*a + pars.a_star**2) )**pars.p
+    a ~ 1/(1+z).
+
+    Memoized on (a, log10_Gamma0, a_star, p) for grids up to _MEMO_MAX_SIZE points; the
+    cached array stays read-only and callers get a copy of it.
+    """
+    if _memoizable(a, pars.log10_Gamma0, pars.a_star, pars.p):
+        out = _gamma_cached(_memo_key(a), float(pars.log10_Gamma0), float(pars.a_star), float(pars.p))
+        return out.copy() if isinstance(out, np.ndarray) else out
+    return _gamma_direct(a, pars.log10_Gamma0, pars.a_star, pars.p)
 
 class LGPDTransfer:
     """A simple wrapper collecting the different effects that feed into observables.
     It provides multiplicative modulations for C_ell and simple damping from decoherence.
+
+    Parameters may also hold 1-D arrays (one entry per walker/sample); the effects then
+    broadcast over a leading batch axis, see batched().
+
+    Only mu0, sigma0 and xi_damp vary inside a fit, so the parts that depend on the other
+    (fixed) parameters are cached: the (k, z) shapes in mu_kz/sigma_kz, and the ℓ(ℓ+1)/ℓ_d² damping
+    shape, both keyed on the array values.
+    The caches are module-level, so transfers rebuilt on every likelihood call share them.
     """
     def __init__(self, lgpd: LGPDParams, cond: CondensateParams, elas: ElasticityParams, thread: ThreadbareParams=None):
         self.lgpd = lgpd
@@ -121,18 +285,27 @@ class LGPDTransfer:
         """Phenomenological anisotropy damping envelope from decoherence.
         We model it as exp[- xi_damp * ell(ell+1)/ell_d^2 ], with ell_d ~ 1500 by default.
         """
-        ell = np.asarray(ell)
-        ell_d = 1500.0
-        return np.exp(- self.lgpd.xi_damp * ell*(ell+1.0) / (ell_d**2))
+        # outer product: (Nell,) for scalar xi_damp, (Nbatch, Nell) for an array of them.
+        # The sign is folded into xi_damp and exp runs in place, so only one array is allocated.
+        shape = np.asarray(_damping_shape(ell))
+        out = np.asarray(np.multiply.outer(-np.asarray(self.lgpd.xi_damp, dtype=shape.dtype), shape))
+        if out.ndim == 0:
+            # scalar ell and xi_damp: np.multiply.outer gives a numpy scalar, not a buffer
+            return np.exp(out)
+        return np.exp(out, out=out)
 
     def lensing_amp(self):
         """Return an effective lensing amplitude A_L ~ 1 + Σ at k~0.1 h/Mpc, z~2."""
         k = 0.1
         z = 2.0
+        if isinstance(self.elas, ElasticityParamsBatch):
+            return 1.0 + sigma_kz_batch(k, z, self.elas)
         return 1.0 + sigma_kz(k, z, self.elas)
 
     def mu_today_large_scales(self):
         # Evaluate μ on large scales (k~0.01 h/Mpc) at z=0 for a rough amplitude proxy.
+        if isinstance(self.cond, CondensateParamsBatch):
+            return mu_kz_batch(0.01, 0.0, self.cond)
         if isinstance(self.cond, CondensateParams):
             return mu_kz(0.01, 0.0, self.cond)
         try:
@@ -144,3 +317,22 @@ class LGPDTransfer:
             pass
         return 0.0
 
+    def batched(self, theta_matrix):
+        """Copy of this transfer with (mu0, sigma0, xi_damp) taken from the columns of
+        theta_matrix (shape (Nbatch, 3)); all other parameters are shared.
+
+        Dl_mod_factor, lensing_amp and mu_today_large_scales of the result carry a leading
+        Nbatch axis, so a whole walker ensemble is evaluated in one NumPy pass.
+        """
+        if not isinstance(self.cond, CondensateParams):
+            raise TypeError("batched() supports the constant-amplitude CondensateParams model only")
+        theta = np.asarray(theta_matrix, dtype=float)
+        lgpd = LGPDParamsBatch.from_params(self.lgpd, xi_damp=theta[:, 2])
+        cond = CondensateParamsBatch.from_params(self.cond, mu0=theta[:, 0])
+        elas = ElasticityParamsBatch.from_params(self.elas, sigma0=theta[:, 1])
+        return LGPDTransfer(lgpd, cond, elas, self.thread)
+
+    def apply_batched(self, ell, cls, theta_matrix):
+        """Modified Cls for every row of theta_matrix: dict of (Nbatch, Nell) arrays."""
+        from .cmb import CMBModulator
+        return CMBModulator(ell).apply(cls, self.batched(theta_matrix))
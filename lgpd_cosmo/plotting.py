@@ -1,34 +1,46 @@
-
 import numpy as np
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+
+# Plots are written straight to files, so they are drawn on a pyplot-free Figure (rendered
+# with Agg by savefig) that is reused across calls: no backend negotiation or figure
+# manager per plot, and importing this module does not change the user's pyplot backend.
+_fig = None
+
+def _axes():
+    global _fig
+    if _fig is None:
+        _fig = Figure()
+        _fig.add_subplot()
+    ax = _fig.axes[0]
+    ax.clear()
+    return ax
 
 def plot_cls(ell, cls_base, cls_mod, out_png):
-    plt.figure()
+    ax = _axes()
+    prefac = ell*(ell+1.0)/(2*np.pi)
     if 'TT' in cls_base:
-        Dl0 = ell*(ell+1)*cls_base['TT']/(2*np.pi)
-        Dl1 = ell*(ell+1)*cls_mod['TT']/(2*np.pi)
-        plt.loglog(ell, Dl0, label='TT baseline')
-        plt.loglog(ell, Dl1, label='TT modified')
+        Dl0 = prefac*cls_base['TT']
+        Dl1 = prefac*cls_mod['TT']
+        ax.loglog(ell, Dl0, label='TT baseline')
+        ax.loglog(ell, Dl1, label='TT modified')
     if 'EE' in cls_base:
-        Dl0 = ell*(ell+1)*cls_base['EE']/(2*np.pi)
-        Dl1 = ell*(ell+1)*cls_mod['EE']/(2*np.pi)
-        plt.loglog(ell, Dl0, label='EE baseline')
-        plt.loglog(ell, Dl1, label='EE modified')
+        Dl0 = prefac*cls_base['EE']
+        Dl1 = prefac*cls_mod['EE']
+        ax.loglog(ell, Dl0, label='EE baseline')
+        ax.loglog(ell, Dl1, label='EE modified')
     if 'TE' in cls_base:
-        Dl0 = np.abs(ell*(ell+1)*cls_base['TE']/(2*np.pi))
-        Dl1 = np.abs(ell*(ell+1)*cls_mod['TE']/(2*np.pi))
-        plt.loglog(ell, Dl0, label='TE |baseline|')
-        plt.loglog(ell, Dl1, label='TE |modified|')
-    plt.xlabel(r'$\ell$')
-    plt.ylabel(r'$D_\ell$')
-    plt.legend()
-    plt.savefig(out_png, bbox_inches='tight')
-    plt.close()
+        Dl0 = np.abs(prefac*cls_base['TE'])
+        Dl1 = np.abs(prefac*cls_mod['TE'])
+        ax.loglog(ell, Dl0, label='TE |baseline|')
+        ax.loglog(ell, Dl1, label='TE |modified|')
+    ax.set_xlabel(r'$\ell$')
+    ax.set_ylabel(r'$D_\ell$')
+    ax.legend()
+    _fig.savefig(out_png, bbox_inches='tight')
 
 def plot_gamma(a, gamma, out_png):
-    plt.figure()
-    plt.loglog(a, gamma)
-    plt.xlabel('a')
-    plt.ylabel('Gamma(a) [s^-1] (arb.)')
-    plt.savefig(out_png, bbox_inches='tight')
-    plt.close()
+    ax = _axes()
+    ax.loglog(a, gamma)
+    ax.set_xlabel('a')
+    ax.set_ylabel('Gamma(a) [s^-1] (arb.)')
+    _fig.savefig(out_png, bbox_inches='tight')
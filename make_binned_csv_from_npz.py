@@ -1,30 +1,45 @@
 
 #!/usr/bin/env python3
-import argparse, numpy as np, os, csv
+import argparse, numpy as np, os
 
-def Dl(ell, Cl): 
-    return ell*(ell+1.0)*Cl/(2*np.pi)
+def Dl(Cl, prefac):
+    # prefac = ell(ell+1)/2π, computed once per ell grid
+    return prefac*Cl
 
 def bin_edges(lmin, lmax, step):
     edges = list(range(lmin, lmax+1, step))
     if edges[-1] < lmax: edges.append(lmax)
     return np.array(edges)
 
-def bin_average(ell, Dl, edges):
-    ells_c = []
-    Dl_c = []
-    sig_c = []
-    for i in range(len(edges)-1):
-        lo, hi = edges[i], edges[i+1]
-        m = (ell >= lo) & (ell < hi)
-        if not np.any(m): 
-            continue
-        ells_c.append(int(np.mean(ell[m])))
-        vals = Dl[m]
-        Dl_c.append(float(np.mean(vals)))
-        # toy sigma: 5% of mean + small floor
-        sig_c.append(float(0.05*np.mean(vals) + 1.0))
-    return np.array(ells_c), np.array(Dl_c), np.array(sig_c)
+# Spectra are binned in slices of this many multipoles, so prefac*Cl is never held at full length
+CHUNK = 1 << 20
+
+def bin_index(ell, edges):
+    # Bin of each ell in [edges[i], edges[i+1]); ell outside the edges goes to an overflow bin nb
+    nb = len(edges) - 1
+    idx = np.digitize(ell, edges) - 1
+    idx[(idx < 0) | (idx >= nb)] = nb
+    return idx
+
+def bin_average(ell, Cl, edges, prefac=None, idx=None, chunk=CHUNK):
+    # Per-bin means of Dl = prefac*Cl (Cl itself if prefac is None) via bincount; empty bins are dropped.
+    # Pass idx = bin_index(ell, edges) to reuse it across spectra on the same ell grid.
+    nb = len(edges) - 1
+    if idx is None:
+        idx = bin_index(ell, edges)
+    cnt = np.bincount(idx, minlength=nb+1)[:nb]
+    ell_sum = np.bincount(idx, weights=ell, minlength=nb+1)[:nb]
+    Dl_sum = np.zeros(nb+1)
+    for s0 in range(0, len(idx), chunk):
+        s1 = s0 + chunk
+        Dl_chunk = Cl[s0:s1] if prefac is None else Dl(Cl[s0:s1], prefac[s0:s1])
+        Dl_sum += np.bincount(idx[s0:s1], weights=Dl_chunk, minlength=nb+1)
+    full = cnt > 0
+    ells_c = (ell_sum[full] / cnt[full]).astype(int)
+    Dl_c = Dl_sum[:nb][full] / cnt[full]
+    # toy sigma: 5% of mean + small floor
+    sig_c = 0.05*Dl_c + 1.0
+    return ells_c, Dl_c, sig_c
 
 def main():
     ap = argparse.ArgumentParser(description="Make simple binned CSVs (ell, Dl, sigma) from NPZ C_ell.")
@@ -35,20 +50,18 @@ def main():
 
     data = np.load(args.npz)
     ell = data["ell"]
+    prefac = ell*(ell+1.0)/(2*np.pi)
+    edges = bin_edges(int(ell.min()), int(ell.max()), args.step)
+    idx = bin_index(ell, edges)
     outputs = []
     for key in ("cltt","clte","clee"):
         if key not in data:
             continue
-        Dl_arr = Dl(ell, data[key])
-        edges = bin_edges(int(ell.min()), int(ell.max()), args.step)
-        ells_c, Dl_c, sig_c = bin_average(ell, Dl_arr, edges)
+        ells_c, Dl_c, sig_c = bin_average(ell, data[key], edges, prefac=prefac, idx=idx)
         band = key[2:].upper()
         out_csv = f"{args.out_prefix}_{band.lower()}_binned.csv"
-        with open(out_csv, "w", newline="") as f:
-            w = csv.writer(f)
-            w.writerow(["ell","Dl","sigma"])
-            for L, d, s in zip(ells_c, Dl_c, sig_c):
-                w.writerow([L, d, s])
+        np.savetxt(out_csv, np.column_stack([ells_c, Dl_c, sig_c]), delimiter=",",
+                   header="ell,Dl,sigma", comments="", fmt=["%d", "%.8e", "%.8e"])
         outputs.append(out_csv)
         print("Wrote", out_csv, "with", len(ells_c), "bands.")
     if not outputs:
@@ -29,6 +29,7 @@ class PlanckPLC:
 
         self.clik = __import__("clik")
         self.likes = {}
+        self._meta = {}
         self.verbose = verbose
 
         for key, path in like_paths.items():
@@ -43,54 +44,74 @@ class PlanckPLC:
                     print(f"[plc] loaded {key}: {path}")
             except Exception as e:
                 raise RuntimeError(f"Failed to load clik likelihood '{key}' at {path}") from e
+            self._meta[key] = self._read_meta(key, self.likes[key])
 
     @staticmethod
-    def _ensure_muK2(arr, units="K"):
-        arr = np.asarray(arr, dtype=float)
+    def _read_meta(key, lkl):
+        # clik metadata is fixed per likelihood; read it once instead of on every nll call
+        pars = list(lkl.get_extra_parameter_names())
+        meta = {
+            'lmax': lkl.get_lmax(),
+            'pars': pars,
+            'defaults': np.array([lkl.get_extra_parameter_default(name) for name in pars], dtype=float),
+        }
+        if key != "lensing":
+            has_cl = lkl.get_has_cl()  # {'tt':bool,'ee':bool,'bb':bool,'te':bool,...}
+            meta['order'] = [spec for spec in ('TT', 'EE', 'BB', 'TE') if has_cl.get(spec.lower(), False)]
+            meta['lmin'] = lkl.get_lmin()
+        return meta
+
+    @staticmethod
+    def _muK2_scale(units="K"):
         if units == "K":
-            return arr * 1.0e12
+            return 1.0e12
         elif units == "muK":
-            return arr
+            return 1.0
         else:
             raise ValueError("units must be 'K' or 'muK'.")
 
     @staticmethod
-    def _build_clik_vec(ell, cl_dict, lkl):
-        has_cl = lkl.get_has_cl()  # {'tt':bool,'ee':bool,'bb':bool,'te':bool,...}
-        order = []
-        if has_cl.get('tt', False): order.append('TT')
-        if has_cl.get('ee', False): order.append('EE')
-        if has_cl.get('bb', False): order.append('BB')
-        if has_cl.get('te', False): order.append('TE')
-
-        lmin = lkl.get_lmin()
-        lmax = lkl.get_lmax()
-
-        vec = []
-        for L in range(lmin, lmax+1):
-            for spec in order:
-                if spec in cl_dict and L < len(cl_dict[spec]):
-                    vec.append(cl_dict[spec][L])
-                else:
-                    vec.append(0.0)
-        return np.array(vec, dtype=float)
+    def _ensure_muK2(arr, units="K"):
+        arr = np.asarray(arr, dtype=float)
+        scale = PlanckPLC._muK2_scale(units)
+        return arr * scale if scale != 1.0 else arr
+
+    @staticmethod
+    def _build_clik_vec(ell, cl_dict, meta, scale=1.0):
+        order = meta['order']
+        lmin = meta['lmin']
+        lmax = meta['lmax']
+
+        # (L, spec) table flattened row-major, i.e. all spectra for lmin, then lmin+1, ...;
+        # multipoles beyond a spectrum's length (or missing spectra) stay zero
+        vec = np.zeros((lmax - lmin + 1, len(order)))
+        for j, spec in enumerate(order):
+            if spec not in cl_dict:
+                continue
+            arr = cl_dict[spec]
+            top = min(len(arr), lmax + 1)
+            if top > lmin:
+                # unit conversion is applied while filling, not on a full-length copy
+                np.multiply(arr[lmin:top], scale, out=vec[:top - lmin, j], dtype=float)
+        return vec.ravel()
 
     @staticmethod
     def _build_lensing_vec(ell, clpp, lkl_len):
         v = np.asarray(clpp, dtype=float)
-        if len(v) < lkl_len:
-            pad = np.zeros(lkl_len - len(v))
-            v = np.concatenate([v, pad])
-        return v[:lkl_len]
+        out = np.zeros(lkl_len)
+        n = min(len(v), lkl_len)
+        out[:n] = v[:n]
+        return out
 
     def nll(self, input_cls: dict, units="K", nuis: dict|None=None):
         ell = np.asarray(input_cls.get("ell"))
         if ell is None:
             raise ValueError("input_cls must contain 'ell' array.")
+        scale = self._muK2_scale(units)
         cl_local = {}
         for k in ("TT","EE","BB","TE"):
             if k in input_cls:
-                cl_local[k] = self._ensure_muK2(input_cls[k], units=units)
+                cl_local[k] = np.asarray(input_cls[k])
 
         # Lensing phi-phi: dimensionless, do NOT scale like temperature spectra
         clpp_local = None
@@ -99,20 +120,21 @@ class PlanckPLC:
         
         total = 0.0
         for key, lkl in self.likes.items():
+            meta = self._meta[key]
             if key == "lensing":
                 if clpp_local is None:
                     raise ValueError("Lensing likelihood loaded but 'PP' (phi-phi) not provided.")
-                vec_len = lkl.get_lmax() + 1
+                vec_len = meta['lmax'] + 1
                 v = self._build_lensing_vec(ell, clpp_local, vec_len)
             else:
-                v = self._build_clik_vec(ell, cl_local, lkl)
+                v = self._build_clik_vec(ell, cl_local, meta, scale)
 
-            pars = lkl.get_extra_parameter_names()
+            pars, defaults = meta['pars'], meta['defaults']
             if nuis is None:
-                x = {name: lkl.get_extra_parameter_default(name) for name in pars}
-                x_vec = np.array([x[name] for name in pars], dtype=float) if len(pars)>0 else np.empty(0)
+                # copy so clik can never write into the cached defaults
+                x_vec = defaults.copy()
             else:
-                x_vec = np.array([nuis.get(name, lkl.get_extra_parameter_default(name)) for name in pars], dtype=float) if len(pars)>0 else np.empty(0)
+                x_vec = np.fromiter((nuis.get(name, d) for name, d in zip(pars, defaults)), dtype=float, count=len(pars))
 
             try:
                 nll = lkl(v, x_vec)
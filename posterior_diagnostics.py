@@ -5,7 +5,7 @@ import argparse, numpy as np, json, os, sys
 
 def load_chain(path):
     dat = np.load(path)
-    chain = dat["chain"]  # (Nsamp, Npar) OR (Nwalkers, Nsteps, Npar) -- we support flat (Nsamp, Npar)
+    chain = dat["chain"]  # (Nsamp, Npar) OR (Nwalkers, Nsteps, Npar)
     logp  = dat.get("logprob", None)
     return chain, logp
 
@@ -18,33 +18,37 @@ def split_rhat(chain):
     chain = np.asarray(chain)
     Ns, D = chain.shape
     half = Ns//2
-    A = chain[:half, :]
-    B = chain[half:2*half, :]
-    def _rhat_2(A, B):
-        # Gelman-Rubin for 2 chains
-        m = 2
-        n = A.shape[0]
-        mA = A.mean(axis=0)
-        mB = B.mean(axis=0)
-        mbar = (mA + mB)/2.0
-        W = ( ((A - mA)**2).sum(axis=0) + ((B - mB)**2).sum(axis=0) ) / (m*(n-1))
-        Bn = n * ( (mA - mbar)**2 + (mB - mbar)**2 )
-        var_hat = ((n-1)/n)*W + (1/n)*Bn
-        Rhat = np.sqrt(var_hat / W)
-        return Rhat
-    return _rhat_2(A, B)
+    # (2, half, D) view of the two halves; no copy
+    halves = chain[:2*half].reshape(2, half, D)
+    return _rhat_v4(halves)
+
+def _rhat_v4(chains):
+    """Gelman-Rubin R-hat for an (M, N, D) stack of chains."""
+    n = chains.shape[1]
+    W = np.var(chains, axis=1, ddof=1).mean(axis=0)
+    B = n * np.var(chains.mean(axis=1), axis=0, ddof=1)
+    var_hat = ((n-1)/n)*W + B/n
+    return np.sqrt(var_hat / (W + 1e-12))
 
 def autocorr_time(chain):
     """
-    Try emcee's integrated autocorrelation time; fallback to a simple estimate if not available.
+    Integrated autocorrelation time per parameter via emcee (FFT-based); NaNs if emcee is
+    not available.
+    chain: (Nwalkers, Nsteps, D) as saved by the sampler, or (Nsamp, D) for a single chain in
+    step order. A flat chain concatenated from several walkers is not a single chain, so
+    pass the 3-D array in that case.
     """
     try:
-        import emcee
-        # emcee expects (nsteps, nwalkers, ndim) typically; we only have flattened samples.
-        # We'll just return NaNs to avoid misleading values.
-        return np.full(chain.shape[1], np.nan)
+        from emcee.autocorr import integrated_time
     except Exception:
-        return np.full(chain.shape[1], np.nan)
+        return np.full(np.shape(chain)[-1], np.nan)
+    chain = np.asarray(chain)
+    # emcee expects (nsteps, nwalkers, ndim); tol=0 returns an estimate even for short chains
+    if chain.ndim == 3:
+        x = chain.transpose(1, 0, 2)
+    else:
+        x = chain.reshape(chain.shape[0], 1, chain.shape[1])
+    return integrated_time(x, tol=0, quiet=True)
 
 def main():
     ap = argparse.ArgumentParser(description="Posterior diagnostics: split-Rhat, logprob stats")
@@ -53,11 +57,17 @@ def main():
     args = ap.parse_args()
 
     chain, logp = load_chain(args.posterior)
+    tau = autocorr_time(chain)
+    if chain.ndim == 3:
+        chain = chain.reshape(-1, chain.shape[-1])
     rhat = split_rhat(chain)
     out = {
         "Nsamp": int(chain.shape[0]),
         "Npar": int(chain.shape[1]),
         "split_Rhat": rhat.tolist(),
+        "tau": tau.tolist(),
+        # emcee's tau = 1 + 2*sum(rho) already counts both sides of the lag sum
+        "ESS": (chain.shape[0] / tau).tolist(),
     }
     if logp is not None:
         out["logprob"] = {
@@ -8,42 +8,46 @@ Reads:
       log_prob or logprob: sampler log-probabilities (optional)
 Writes:
   - output .npz with keys: chain, log_prob, A_L_chain
+    chain and log_prob are copied through unchanged; A_L_chain is a derived summary
+    needed to ~1e-2, so it is stored as float32 (half the size on disk)
 
 Usage:
   python scripts/compute_AL_chain.py --posterior outputs/multiprobe/multiprobe_posterior.npz --out outputs/multiprobe/posterior_with_AL.npz
 """
 import argparse
+import functools
 import numpy as np
 
+from lgpd_cosmo.data import load_posterior_chain
 from lgpd_cosmo.models import ElasticityParams, sigma_kz
 
 
+@functools.cache
+def _al_const(k_ref=0.1, z_ref=2.0, k0=0.1, m=2.0, zt=1.5, n=3.0):
+    # Sigma is linear in sigma0, so Sigma(k_ref, z_ref) at sigma0=1 is the per-sample factor;
+    # cached so repeated calls (other chains, callers importing this module) pay for it once
+    return sigma_kz(k_ref, z_ref, ElasticityParams(sigma0=1.0, k0=k0, m=m, zt=zt, n=n))
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument('--posterior', required=True, help='Input posterior .npz with chain')
     ap.add_argument('--out', required=True, help='Output .npz to write (with A_L_chain)')
+    ap.add_argument('--assert-equiv', action='store_true',
+                    help='Check the batched A_L of the first sample against a scalar sigma_kz call')
     args = ap.parse_args()
 
-    post = np.load(args.posterior, allow_pickle=True)
-    chain = np.asarray(post['chain'])
-    # support both log_prob and logprob
-    logp = None
-    if 'log_prob' in post:
-        logp = np.asarray(post['log_prob'])
-    elif 'logprob' in post:
-        logp = np.asarray(post['logprob'])
+    # chain as stored (it is copied through unchanged); log_prob or logprob, if present
+    chain, _, logp = load_posterior_chain(args.posterior, dtype=None)
 
     # chain order: [mu0, sigma0, xi_damp]
     # A_L proxy: 1 + Sigma(k=0.1 h/Mpc, z=2)
     k_ref = 0.1
     z_ref = 2.0
-    A_L_chain = []
-    for i in range(chain.shape[0]):
-        sigma0 = chain[i, 1]
-        elas = ElasticityParams(sigma0=sigma0, k0=0.1, m=2.0, zt=1.5, n=3.0)
-        sig = sigma_kz(k_ref, z_ref, elas)
-        A_L_chain.append(1.0 + sig)
-    A_L_chain = np.array(A_L_chain)
+    A_L_chain = (1.0 + chain[:, 1] * _al_const(k_ref, z_ref)).astype(np.float32)
+    if args.assert_equiv and len(chain):
+        ref = 1.0 + sigma_kz(k_ref, z_ref, ElasticityParams(sigma0=chain[0, 1], k0=0.1, m=2.0, zt=1.5, n=3.0))
+        assert np.isclose(A_L_chain[0], ref, rtol=1e-6, atol=0.0), (A_L_chain[0], ref)
 
     save_kwargs = {'chain': chain, 'A_L_chain': A_L_chain}
     if logp is not None:
@@ -51,7 +55,8 @@ def main():
 
     np.savez(args.out, **save_kwargs)
     print(f"Added A_L_chain to {args.out}")
-    print(f"A_L median={np.median(A_L_chain):.4f}, 68% CI=[{np.percentile(A_L_chain,16):.4f}, {np.percentile(A_L_chain,84):.4f}]")
+    q16, q50, q84 = np.quantile(A_L_chain, [0.16, 0.5, 0.84])
+    print(f"A_L median={q50:.4f}, 68% CI=[{q16:.4f}, {q84:.4f}]")
 
 
 if __name__ == '__main__':
@@ -4,7 +4,7 @@ MCMC Convergence Diagnostics
 
 Generates comprehensive convergence diagnostics for LGPD MCMC chains:
 - Trace plots for all parameters
-- R-hat (Gelman-Rubin) statistics  
+- Rank-normalized R-hat statistics (Vehtari et al. 2021)
 - Autocorrelation analysis
 - Effective sample sizes
 - Summary statistics table
@@ -30,23 +30,69 @@ Date: 2025-10-03
 
 import numpy as np
 import matplotlib.pyplot as plt
+from scipy.fft import next_fast_len, rfft, irfft
+from scipy.stats import norm, rankdata
 import sys
 from pathlib import Path
 
 repo_root = Path(__file__).parent.parent
 sys.path.insert(0, str(repo_root))
 
+from lgpd_cosmo import _kernels
+
+# Up to this many lags the fused numba loop beats the FFT (measured for N = 2e3..1e6)
+DIRECT_ACF_MAX_LAGS = 256
+# Hard cap on ACF lags: tau_int never needs more, and longer curves are unplottable
+MAX_ACF_LAGS = 5000
+
 plt.rcParams.update({
     'font.size': 10,
     'font.family': 'serif',
     'figure.dpi': 150,
     'savefig.dpi': 300,
+    'axes.grid': True,
+    'grid.alpha': 0.3,
 })
 
 
+def _rhat_basic(chains):
+    """Classic Gelman-Rubin R-hat of an (M, N, ndim) stack of equal-length chains.
+
+    compute_rhat applies it to rank-normalized (and folded) draws; on raw draws it is
+    the pre-2021 statistic.
+    """
+    N = chains.shape[1]
+    # (ndim, M, N) copy so every reduction below runs over the contiguous last axis
+    chains_T = np.ascontiguousarray(chains.transpose(2, 0, 1))
+    
+    # Within-chain variance
+    W = chains_T.var(axis=2, ddof=1).mean(axis=1)
+    
+    # Between-chain variance
+    chain_means = chains_T.mean(axis=2)  # (ndim, M)
+    B = N * chain_means.var(axis=1, ddof=1)
+    
+    # Pooled variance
+    var_plus = ((N - 1) * W + B) / N
+    
+    return np.sqrt(var_plus / (W + 1e-12))
+
+
+def _rank_normalize(chains):
+    """Replace pooled draws by normal scores of their ranks, per parameter (Vehtari+ 2021)."""
+    M, N, ndim = chains.shape
+    flat = chains.reshape(M*N, ndim)
+    r = rankdata(flat, method='average', axis=0)
+    return norm.ppf((r - 0.375) / (M*N + 0.25)).reshape(M, N, ndim)
+
+
 def compute_rhat(chains_list):
     """
-    Compute Gelman-Rubin R-hat statistic.
+    Compute the rank-normalized R-hat statistic (Vehtari et al. 2021).
+    
+    R-hat is evaluated on rank-normalized draws and on rank-normalized folded draws
+    |x - median|, and the larger value is reported, so heavy tails and differences in
+    scale between chains are caught as well as differences in location.
     
     Parameters
     ----------
@@ -61,26 +107,17 @@ def compute_rhat(chains_list):
     if len(chains_list) < 2:
         return None
     
-    M = len(chains_list)
     N = min(c.shape[0] for c in chains_list)
-    ndim = chains_list[0].shape[1]
     
     # Trim to same length
-    chains = np.array([c[:N, :] for c in chains_list])  # (M, N, ndim)
-    
-    # Within-chain variance
-    W = np.mean(np.var(chains, axis=1, ddof=1), axis=0)
-    
-    # Between-chain variance
-    chain_means = np.mean(chains, axis=1)  # (M, ndim)
-    B = N * np.var(chain_means, axis=0, ddof=1)
-    
-    # Pooled variance
-    var_plus = ((N - 1) * W + B) / N
-    
-    # R-hat
-    rhat = np.sqrt(var_plus / (W + 1e-12))
-    return rhat
+    chains = np.empty((len(chains_list), N, chains_list[0].shape[1]))  # (M, N, ndim)
+    for j, c in enumerate(chains_list):
+        chains[j] = c[:N]
+    
+    folded = np.abs(chains - np.median(chains.reshape(-1, chains.shape[2]), axis=0))
+    rhat_bulk = _rhat_basic(_rank_normalize(chains))
+    rhat_tail = _rhat_basic(_rank_normalize(folded))
+    return np.maximum(rhat_bulk, rhat_tail)
 
 
 def compute_autocorr(chain, maxlag=200):
@@ -92,7 +129,7 @@ def compute_autocorr(chain, maxlag=200):
     chain : array (N,)
         1D chain
     maxlag : int
-        Maximum lag
+        Maximum lag; clamped to N//2 and MAX_ACF_LAGS
     
     Returns
     -------
@@ -101,20 +138,53 @@ def compute_autocorr(chain, maxlag=200):
     acf : array
         Autocorrelation values
     """
-    chain = chain - np.mean(chain)
-    c0 = np.dot(chain, chain) / len(chain)
-    
-    acf = []
-    lags = np.arange(0, min(maxlag, len(chain)//2))
+    lags, acf = compute_autocorr_batch(np.asarray(chain)[:, None], maxlag)
+    return lags, acf[:, 0]
+
+
+def compute_autocorr_batch(chain, maxlag=200):
+    """
+    Autocorrelation functions of every column of a chain at once.
     
-    for lag in lags:
-        if lag == 0:
-            acf.append(1.0)
-        else:
-            c = np.dot(chain[:-lag], chain[lag:]) / (len(chain) - lag)
-            acf.append(c / c0)
+    Parameters
+    ----------
+    chain : array (N, ndim)
+    maxlag : int
+        Maximum lag; clamped to N//2 and MAX_ACF_LAGS
     
-    return lags, np.array(acf)
+    Returns
+    -------
+    lags : array (L,)
+    acf : array (L, ndim)
+    """
+    chain = np.asarray(chain)
+    N, ndim = chain.shape
+    lags = np.arange(0, int(min(maxlag, N//2, MAX_ACF_LAGS)))
+    
+    if len(lags) == 0:
+        return lags, np.empty((0, ndim))
+    # The demeaned data is written into one preallocated buffer rather than a fresh
+    # chain - mean copy (chain may also be a read-only memmap)
+    mean = chain.mean(axis=0)
+    if _kernels.HAVE_NUMBA and len(lags) <= DIRECT_ACF_MAX_LAGS:
+        acf = np.empty((len(lags), ndim))
+        buf = np.empty(N)
+        for j in range(ndim):
+            np.subtract(chain[:, j], mean[j], out=buf)
+            acf[:, j] = _kernels.acf_direct(buf, len(lags))
+        return lags, acf
+    
+    # Autocovariance for all lags and columns in one FFT pass (zero-padded to avoid
+    # wrap-around), normalized per lag by the N - lag overlapping pairs. The demeaned
+    # chain is written straight into the padded FFT input.
+    fft_len = next_fast_len(2*N - 1)
+    buf = np.zeros((fft_len, ndim))
+    np.subtract(chain, mean, out=buf[:N])
+    fx = rfft(buf, axis=0)
+    acov = irfft(fx * np.conj(fx), fft_len, axis=0)[:len(lags)] / np.arange(N, N - len(lags), -1)[:, None]
+    acf = acov / acov[0]
+    
+    return lags, acf
 
 
 def integrated_autocorr_time(acf, c=5):
@@ -135,40 +205,54 @@ def integrated_autocorr_time(acf, c=5):
     tau : float
         Integrated autocorrelation time
     """
-    tau = 2 * np.cumsum(acf) - 1
-    for M in range(len(acf)):
-        if M >= c * tau[M]:
-            return tau[M]
-    return tau[-1]
+    return integrated_autocorr_time_batch(np.asarray(acf)[:, None], c)[0]
+
+
+def integrated_autocorr_time_batch(acf, c=5):
+    """
+    integrated_autocorr_time for each column of an (L, ndim) ACF array.
+    
+    The window is the first M with M >= c*tau(M), found for all columns at once;
+    columns where no such M exists use the full window.
+    """
+    tau = 2 * np.cumsum(acf, axis=0) - 1
+    ok = np.arange(len(acf))[:, None] >= c * tau
+    M = np.where(ok.any(axis=0), np.argmax(ok, axis=0), len(acf) - 1)
+    return tau[M, np.arange(tau.shape[1])]
 
 
 def plot_traces(chain, param_names, output_file):
     """Generate trace plots for all parameters."""
-    fig, axes = plt.subplots(len(param_names), 1, figsize=(10, 2*len(param_names)))
+    fig, axes = plt.subplots(len(param_names), 1, figsize=(10, 2*len(param_names)), constrained_layout=True)
     if len(param_names) == 1:
         axes = [axes]
     
+    # ~5000 points per trace is already beyond what a 10-inch axis resolves at 300 dpi;
+    # drawing every sample only makes savefig slow
+    stride = max(1, len(chain) // 5000)
+    steps = np.arange(0, len(chain), stride)
     for i, (ax, name) in enumerate(zip(axes, param_names)):
-        ax.plot(chain[:, i], 'k-', alpha=0.5, lw=0.5)
+        ax.plot(steps, chain[::stride, i], 'k-', alpha=0.5, lw=0.5)
         ax.set_ylabel(name)
-        ax.grid(alpha=0.3)
         
         # Add running mean
         window = 100
         if len(chain) > window:
-            running_mean = np.convolve(chain[:, i], np.ones(window)/window, mode='valid')
+            # O(N) window sums from a cumulative sum instead of an O(N*window) convolve
+            cs = np.cumsum(np.insert(chain[:, i], 0, 0.0))
+            running_mean = (cs[window:] - cs[:-window]) / window
             ax.plot(np.arange(window//2, len(chain)-window//2+1), running_mean, 'r-', lw=1.5, alpha=0.7)
     
     axes[-1].set_xlabel('Step')
-    plt.tight_layout()
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
-    plt.close()
+    fig.savefig(output_file, dpi=300, bbox_inches='tight')
+    fig.clear()
+    plt.close(fig)
     print(f"  ✓ Trace plots saved to {output_file}")
 
 
 def plot_autocorr(chain, param_names, output_file):
     """Generate autocorrelation plots."""
-    fig, axes = plt.subplots(len(param_names), 1, figsize=(8, 2*len(param_names)))
+    fig, axes = plt.subplots(len(param_names), 1, figsize=(8, 2*len(param_names)), constrained_layout=True)
     if len(param_names) == 1:
         axes = [axes]
     
@@ -180,14 +264,13 @@ def plot_autocorr(chain, param_names, output_file):
         ax.set_ylabel(f'ACF({name})')
         ax.set_xlim(0, len(lags))
         ax.set_ylim(-0.2, 1.0)
-        ax.grid(alpha=0.3)
         if i == 0:
             ax.legend(loc='upper right')
     
     axes[-1].set_xlabel('Lag')
-    plt.tight_layout()
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
-    plt.close()
+    fig.savefig(output_file, dpi=300, bbox_inches='tight')
+    fig.clear()
+    plt.close(fig)
     print(f"  ✓ Autocorrelation plots saved to {output_file}")
 
 
@@ -198,12 +281,8 @@ def generate_diagnostics_table(chain, param_names, output_dir):
     stds = np.std(chain, axis=0)
     
     # Autocorrelation times
-    tau = []
-    for i in range(chain.shape[1]):
-        lags, acf = compute_autocorr(chain[:, i])
-        tau_i = integrated_autocorr_time(acf)
-        tau.append(tau_i)
-    tau = np.array(tau)
+    lags, acf = compute_autocorr_batch(chain)
+    tau = integrated_autocorr_time_batch(acf)
     
     # Effective sample sizes
     n_total = len(chain)
@@ -220,72 +299,78 @@ def generate_diagnostics_table(chain, param_names, output_dir):
     
     # Text table
     txt_file = output_dir / "diagnostics_table.txt"
-    with open(txt_file, 'w') as f:
-        f.write("MCMC CONVERGENCE DIAGNOSTICS\n")
-        f.write("="*70 + "\n\n")
-        f.write(f"Total samples: {n_total}\n")
-        f.write(f"Burn-in: assumed in posterior_chain.npz (already removed)\n\n")
-        
-        f.write(f"{'Parameter':<15} {'Median':<10} {'Std':<10} {'τ_int':<10} {'N_eff':<10} {'R̂':<10}\n")
-        f.write("-"*70 + "\n")
-        
-        for i, name in enumerate(param_names):
-            rhat_str = f"{rhat[i]:.4f}" if rhat is not None else "N/A"
-            f.write(f"{name:<15} {medians[i]:<10.4f} {stds[i]:<10.4f} "
+    buf = []
+    buf.append("MCMC CONVERGENCE DIAGNOSTICS\n")
+    buf.append("="*70 + "\n\n")
+    buf.append(f"Total samples: {n_total}\n")
+    buf.append(f"Burn-in: assumed in posterior_chain.npz (already removed)\n\n")
+    
+    buf.append(f"{'Parameter':<15} {'Median':<10} {'Std':<10} {'τ_int':<10} {'N_eff':<10} {'R̂':<10}\n")
+    buf.append("-"*70 + "\n")
+    
+    for i, name in enumerate(param_names):
+        rhat_str = f"{rhat[i]:.4f}" if rhat is not None else "N/A"
+        buf.append(f"{name:<15} {medians[i]:<10.4f} {stds[i]:<10.4f} "
                    f"{tau[i]:<10.1f} {n_eff[i]:<10.0f} {rhat_str:<10}\n")
-        
-        f.write("\n" + "="*70 + "\n")
-        f.write("\nDiagnostic criteria:\n")
-        f.write("  ✓ R̂ < 1.01: Excellent convergence\n")
-        f.write("  ✓ N_eff > 400: Sufficient for reliable posteriors\n")
-        f.write("  ✓ τ_int < 50: Good mixing\n\n")
-        
-        # Assess convergence
-        if rhat is not None:
-            max_rhat = np.max(rhat)
-            f.write(f"Max R̂ = {max_rhat:.4f}")
-            if max_rhat < 1.01:
-                f.write(" → EXCELLENT convergence\n")
-            elif max_rhat < 1.05:
-                f.write(" → GOOD convergence\n")
-            else:
-                f.write(" → WARNING: May need more samples\n")
-        
-        min_neff = np.min(n_eff)
-        f.write(f"Min N_eff = {min_neff:.0f}")
-        if min_neff > 1000:
-            f.write(" → EXCELLENT\n")
-        elif min_neff > 400:
-            f.write(" → GOOD\n")
+    
+    buf.append("\n" + "="*70 + "\n")
+    buf.append("\nDiagnostic criteria:\n")
+    buf.append("  ✓ R̂ < 1.01: Excellent convergence\n")
+    buf.append("  ✓ N_eff > 400: Sufficient for reliable posteriors\n")
+    buf.append("  ✓ τ_int < 50: Good mixing\n\n")
+    
+    # Assess convergence
+    if rhat is not None:
+        max_rhat = np.max(rhat)
+        buf.append(f"Max R̂ = {max_rhat:.4f}")
+        if max_rhat < 1.01:
+            buf.append(" → EXCELLENT convergence\n")
+        elif max_rhat < 1.05:
+            buf.append(" → GOOD convergence\n")
         else:
-            f.write(" → WARNING: Consider longer run\n")
+            buf.append(" → WARNING: May need more samples\n")
+    
+    min_neff = np.min(n_eff)
+    buf.append(f"Min N_eff = {min_neff:.0f}")
+    if min_neff > 1000:
+        buf.append(" → EXCELLENT\n")
+    elif min_neff > 400:
+        buf.append(" → GOOD\n")
+    else:
+        buf.append(" → WARNING: Consider longer run\n")
+    
+    with open(txt_file, 'w') as f:
+        f.write(''.join(buf))
     
     print(f"  ✓ Text diagnostics saved to {txt_file}")
     
     # LaTeX table
     tex_file = output_dir / "diagnostics_table.tex"
-    with open(tex_file, 'w') as f:
-        f.write("\\begin{table}[t]\n")
-        f.write("\\centering\n")
-        f.write("\\caption{MCMC convergence diagnostics. $\\tau_{\\rm int}$ is the integrated autocorrelation time; "
+    buf = []
+    buf.append("\\begin{table}[t]\n")
+    buf.append("\\centering\n")
+    buf.append("\\caption{MCMC convergence diagnostics. $\\tau_{\\rm int}$ is the integrated autocorrelation time; "
                "$N_{\\rm eff} = N_{\\rm total}/(2\\tau_{\\rm int})$ is the effective sample size; "
-               "$\\hat{R}$ is the Gelman-Rubin statistic.}\n")
-        f.write("\\label{tab:convergence}\n")
-        f.write("\\begin{tabular}{lcccccc}\n")
-        f.write("\\hline\n")
-        f.write("Parameter & Median & Std & $\\tau_{\\rm int}$ & $N_{\\rm eff}$ & $\\hat{R}$ \\\\\n")
-        f.write("\\hline\n")
-        
-        for i, name in enumerate(param_names):
-            rhat_str = f"{rhat[i]:.3f}" if rhat is not None else "--"
-            # LaTeX-safe parameter names
-            name_tex = name.replace('_', '\\_')
-            f.write(f"${name_tex}$ & {medians[i]:.4f} & {stds[i]:.4f} & "
+               "$\\hat{R}$ is the rank-normalized split-$\\hat{R}$ of Vehtari et al. (2021).}\n")
+    buf.append("\\label{tab:convergence}\n")
+    buf.append("\\begin{tabular}{lcccccc}\n")
+    buf.append("\\hline\n")
+    buf.append("Parameter & Median & Std & $\\tau_{\\rm int}$ & $N_{\\rm eff}$ & $\\hat{R}$ \\\\\n")
+    buf.append("\\hline\n")
+    
+    for i, name in enumerate(param_names):
+        rhat_str = f"{rhat[i]:.3f}" if rhat is not None else "--"
+        # LaTeX-safe parameter names
+        name_tex = name.replace('_', '\\_')
+        buf.append(f"${name_tex}$ & {medians[i]:.4f} & {stds[i]:.4f} & "
                    f"{tau[i]:.1f} & {n_eff[i]:.0f} & {rhat_str} \\\\\n")
-        
-        f.write("\\hline\n")
-        f.write("\\end{tabular}\n")
-        f.write("\\end{table}\n")
+    
+    buf.append("\\hline\n")
+    buf.append("\\end{tabular}\n")
+    buf.append("\\end{table}\n")
+    
+    with open(tex_file, 'w') as f:
+        f.write(''.join(buf))
     
     print(f"  ✓ LaTeX table saved to {tex_file}")
 
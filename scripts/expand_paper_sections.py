@@ -9,6 +9,8 @@ Usage:
 import argparse
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 REPO_ROOT = Path(__file__).parent.parent
@@ -27,46 +29,64 @@ TARGET_WORDS = {
 TOTAL_TARGET = 3000  # Nature Physics limit
 
 
-def count_words_in_tex(filepath):
-    """Count words in a .tex file, excluding LaTeX commands."""
-    if not os.path.exists(filepath):
-        return 0
-    with open(filepath, 'r') as f:
+# Display equations go first: otherwise the command pattern eats \begin{equation} and
+# the equation body is counted as words. Comments, inline math and commands are then
+# stripped in one pass with a single alternation.
+_EQ = re.compile(r'\\begin\{equation\*?\}.*?\\end\{equation\*?\}', re.DOTALL)
+_CMT = re.compile(r'%.*')
+_MATH = re.compile(r'\$.*?\$')
+_CMD = re.compile(r'\\[a-zA-Z]+(\[.*?\])?(\{.*?\})?')
+_STRIP = re.compile('|'.join([_CMT.pattern, _MATH.pattern, _CMD.pattern]))
+
+
+@lru_cache(maxsize=64)
+def _count_cached(path, mtime):
+    # mtime is part of the key only, so an edited file misses the cache and is re-read
+    with open(path, 'r') as f:
         text = f.read()
-    # Remove comments
-    text = re.sub(r'%.*', '', text)
-    # Remove LaTeX commands (rough approximation)
-    text = re.sub(r'\\[a-zA-Z]+(\[.*?\])?(\{.*?\})?', ' ', text)
-    # Remove math mode
-    text = re.sub(r'\$.*?\$', ' ', text)
-    text = re.sub(r'\\\\begin\{equation.*?\}.*?\\\\end\{equation.*?\}', ' ', text, flags=re.DOTALL)
+    text = _EQ.sub(' ', text)
+    text = _STRIP.sub(' ', text)
     # Count words
     words = text.split()
     return len(words)
 
 
+def count_words_in_tex(filepath):
+    """Count words in a .tex file, excluding LaTeX commands."""
+    try:
+        mtime = os.path.getmtime(filepath)
+    except OSError:
+        return 0
+    return _count_cached(str(filepath), mtime)
+
+
+def _section_count(section):
+    """(word count, version label) for a section, preferring the _full version."""
+    # Try both original and _full versions
+    filepath = PAPER_DIR / f"{section}.tex"
+    filepath_full = PAPER_DIR / f"{section}_full.tex"
+    
+    if filepath_full.exists():
+        return count_words_in_tex(filepath_full), " (full)"
+    elif filepath.exists():
+        return count_words_in_tex(filepath), ""
+    else:
+        return 0, " (missing)"
+
+
 def check_progress():
     """Check current word counts for all sections."""
     print("="*70)
     print("PAPER COMPLETION STATUS")
     print("="*70)
     
+    # stat and read the section files concurrently (slow on network-mounted paper dirs);
+    # map keeps the results in TARGET_WORDS order
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        counts = list(pool.map(_section_count, TARGET_WORDS))
+    
     total_words = 0
-    for section, target in TARGET_WORDS.items():
-        # Try both original and _full versions
-        filepath = PAPER_DIR / f"{section}.tex"
-        filepath_full = PAPER_DIR / f"{section}_full.tex"
-        
-        if filepath_full.exists():
-            count = count_words_in_tex(filepath_full)
-            version = " (full)"
-        elif filepath.exists():
-            count = count_words_in_tex(filepath)
-            version = ""
-        else:
-            count = 0
-            version = " (missing)"
-        
+    for (section, target), (count, version) in zip(TARGET_WORDS.items(), counts):
         total_words += count
         pct = (count / target) * 100 if target > 0 else 0
         status = "✓" if count >= target else "✗"
@@ -86,9 +106,7 @@ def check_progress():
         print("✓ Within target range")
 
 
-def generate_theory_template():
-    """Generate detailed theory section template."""
-    template = r"""
+_THEORY_TEMPLATE = r"""
 \subsection{Phenomenological Framework}
 
 We adopt a two-component phenomenological approach to modified gravity at cosmological scales, combining photon decoherence with scale-dependent gravitational response functions.
@@ -168,7 +186,11 @@ The thermalization rate $\Gamma(a)$ injects energy into the CMB, potentially cre
 [FILL IN: How you modified CLASS or CAMB. Brief description of line-of-sight integration. Validation tests.]
 
 """
-    return template
+
+
+def generate_theory_template():
+    """Generate detailed theory section template."""
+    return _THEORY_TEMPLATE
 
 
 def main():
@@ -9,17 +9,24 @@ Reads posterior samples and baseline data, produces:
 5. Residuals plot
 """
 import numpy as np
+import matplotlib
+matplotlib.use('Agg', force=True)
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from scipy.stats import gaussian_kde
+import hashlib
 import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
 # Ensure repo root is in path
 repo_root = Path(__file__).parent.parent
 sys.path.insert(0, str(repo_root))
 
-from lgpd_cosmo.data import DataRepository
+from lgpd_cosmo.data import DataRepository, load_posterior_chain
 from lgpd_cosmo.models import LGPDParams, CondensateParams, ElasticityParams, LGPDTransfer
 from lgpd_cosmo.cmb import apply_modifications
+from lgpd_cosmo import cmb, models
 
 # Publication-quality matplotlib settings
 plt.rcParams.update({
@@ -35,47 +42,74 @@ plt.rcParams.update({
     'savefig.dpi': 300,
     'savefig.bbox': 'tight',
     'text.usetex': False,  # Set True if LaTeX available
+    'agg.path.chunksize': 10000,  # let Agg render long paths in chunks
 })
+plt.ioff()
+
+# Figure 1 bands are evaluated at every max(1, L // BAND_POINTS)-th multipole, from
+# BAND_SAMPLES posterior draws chosen with a fixed seed (so a cached band is the same figure
+# a rerun would draw)
+BAND_POINTS = 600
+BAND_SAMPLES = 200
+BAND_SEED = 0
+
+# Below this many samples the constraint plane is drawn from a KDE instead of a histogram
+KDE_MAX_SAMPLES = 5000
 
 def load_posterior():
     """Load posterior samples from MCMC chain."""
     chain_file = repo_root / "outputs" / "posterior_chain.npz"
     if not chain_file.exists():
         raise FileNotFoundError(f"Posterior chain not found at {chain_file}")
-    data = np.load(chain_file)
-    samples = data['samples']  # shape (nsteps, nparams)
-    param_names = data['param_names'].tolist()
-    log_prob = data['log_prob']
-    return samples, param_names, log_prob
+    # samples: read-only float32 memmap, shape (nsteps, nparams)
+    return load_posterior_chain(chain_file)
 
 def compute_bestfit_and_percentiles(samples):
     """Get best-fit (median) and 68% credible intervals."""
-    median = np.median(samples, axis=0)
-    lower = np.percentile(samples, 16, axis=0)
-    upper = np.percentile(samples, 84, axis=0)
+    lower, median, upper = np.quantile(samples, [0.16, 0.5, 0.84], axis=0)
     return median, lower, upper
 
 def generate_modified_spectra(mu0, Sigma0, xi_damp, baseline_cls):
-    """Generate modified Cls given parameters."""
+    """Generate modified Cls given parameters; returns (ell, cltt, clte, clee)."""
     lgpd_p = LGPDParams(xi_damp=xi_damp)
     cond_p = CondensateParams(mu0=mu0)
     elast_p = ElasticityParams(sigma0=Sigma0)
     transfer = LGPDTransfer(lgpd_p, cond_p, elast_p)
     
     ell, cltt, clte, clee = baseline_cls
-    mod_cls = apply_modifications(ell, cltt, clte, clee, transfer, apply_lgpd=True, apply_mu_sigma=True)
-    return mod_cls
+    mod_cls = apply_modifications(ell, {'TT': cltt, 'TE': clte, 'EE': clee}, transfer)
+    return ell, mod_cls['TT'], mod_cls['TE'], mod_cls['EE']
 
-def plot_power_spectra_with_bands(baseline_cls, samples, param_names, output_dir):
-    """
-    Figure 1: TT/TE/EE power spectra showing baseline, best-fit, and 68% posterior bands.
+def _draw_sample_curves(ax, x, curves):
+    """Draw posterior sample curves as one LineCollection rather than one Line2D each."""
+    segs = np.empty(curves.shape + (2,), dtype=curves.dtype)
+    segs[..., 0] = x
+    segs[..., 1] = curves
+    ax.add_collection(LineCollection(segs, colors='red', alpha=0.02, linewidths=0.5))
+
+def _band_cache(chain_file, baseline_file):
+    """Cache path for the Figure 1 bands of this (posterior chain, baseline) pair.
+
+    The key covers both input files, the band settings and the source of the model code the
+    bands are computed with, so changing any of them computes fresh bands.
     """
+    h = hashlib.md5()
+    for f in (chain_file, baseline_file):
+        st = f.stat()
+        h.update(f"{st.st_mtime_ns}-{st.st_size};".encode())
+    h.update(f"{BAND_POINTS}-{BAND_SAMPLES}-{BAND_SEED};".encode())
+    for mod in (models, cmb):
+        h.update(Path(mod.__file__).read_bytes())
+    return repo_root / "outputs" / ".cache" / f"bands_{h.hexdigest()[:12]}.npz"
+
+def _compute_bands(baseline_cls, samples, pn_idx):
+    """Best-fit spectra and 68% band limits (on the strided ℓ grid) plus the band samples."""
     ell, cltt_base, clte_base, clee_base = baseline_cls
     
     # Get parameter columns
-    mu0_idx = param_names.index('mu_0')
-    Sigma0_idx = param_names.index('Sigma_0')
-    xi_idx = param_names.index('xi_damp')
+    mu0_idx = pn_idx['mu_0']
+    Sigma0_idx = pn_idx['Sigma_0']
+    xi_idx = pn_idx['xi_damp']
     
     # Best-fit (median)
     median_params = np.median(samples, axis=0)
@@ -83,41 +117,83 @@ def plot_power_spectra_with_bands(baseline_cls, samples, param_names, output_dir
     
     # Generate best-fit modified spectra
     mod_cls_bf = generate_modified_spectra(mu0_bf, Sigma0_bf, xi_bf, baseline_cls)
-    ell_mod, cltt_mod, clte_mod, clee_mod = mod_cls_bf
+    _, cltt_mod, clte_mod, clee_mod = mod_cls_bf
     
     # Generate posterior bands (sample random subset for speed)
-    n_band_samples = min(200, len(samples))
-    rand_idx = np.random.choice(len(samples), n_band_samples, replace=False)
-    
-    cltt_band = []
-    clte_band = []
-    clee_band = []
-    
-    for idx in rand_idx:
-        mu0_s, Sigma0_s, xi_s = samples[idx, [mu0_idx, Sigma0_idx, xi_idx]]
-        mod_s = generate_modified_spectra(mu0_s, Sigma0_s, xi_s, baseline_cls)
-        cltt_band.append(mod_s[1])
-        clte_band.append(mod_s[2])
-        clee_band.append(mod_s[3])
+    n_band_samples = min(BAND_SAMPLES, len(samples))
+    rand_idx = np.random.default_rng(BAND_SEED).choice(len(samples), n_band_samples, replace=False)
+    
+    # One batched pass over all band samples: apply_batched evaluates the transfer for every
+    # (mu0, Sigma0, xi_damp) row at once and returns (n_band_samples, L) spectra
+    theta = samples[rand_idx][:, [mu0_idx, Sigma0_idx, xi_idx]]
+    transfer = LGPDTransfer(LGPDParams(), CondensateParams(), ElasticityParams())
+    band = transfer.apply_batched(ell, {'TT': cltt_base, 'TE': clte_base, 'EE': clee_base}, theta)
+    # Bands are kept at every stride-th multipole only: ~600 points on a 7-inch linear ℓ axis
+    # is already beyond what is visible, and it shrinks both the percentile work and the
+    # fill_between polygons. float32 is plenty for a 68% band and halves the sort's memory traffic.
+    stride = max(1, len(ell) // BAND_POINTS)
+    cltt_band = band['TT'][:, ::stride].astype(np.float32)
+    clte_band = band['TE'][:, ::stride].astype(np.float32)
+    clee_band = band['EE'][:, ::stride].astype(np.float32)
+    
+    # 68% bands; order statistics (method='lower') are exact enough at 200 samples and skip
+    # the interpolation pass. The three panels are independent and numpy drops the GIL while
+    # sorting, so they run side by side on threads (no pickling, arrays shared in place).
+    np.abs(clte_band, out=clte_band)
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        (lo_tt, hi_tt), (lo_te, hi_te), (lo_ee, hi_ee) = pool.map(
+            lambda a: np.quantile(a, [0.16, 0.84], axis=0, method='lower'),
+            [cltt_band, clte_band, clee_band])
+    
+    bands = dict(cltt_mod=cltt_mod, clte_mod=clte_mod, clee_mod=clee_mod,
+                 lo_tt=lo_tt, hi_tt=hi_tt, lo_te=lo_te, hi_te=hi_te, lo_ee=lo_ee, hi_ee=hi_ee)
+    return bands, (cltt_band, clte_band, clee_band)
+
+def plot_power_spectra_with_bands(baseline_cls, samples, pn_idx, output_dir, sample_curves=0, cache_file=None):
+    """
+    Figure 1: TT/TE/EE power spectra showing baseline, best-fit, and 68% posterior bands.
+
+    If sample_curves > 0, that many of the band samples are also drawn as thin curves.
+    With a cache_file (see _band_cache), the best-fit spectra and band limits are read from
+    it when present and written to it otherwise, so restyling the figure skips the band work.
+    """
+    ell, cltt_base, clte_base, clee_base = baseline_cls
     
-    # Convert to Dl = l(l+1)Cl/(2π)
-    def cl_to_dl(ell, cl):
-        return ell * (ell + 1) * cl / (2 * np.pi)
+    # The band samples themselves are not cached, so drawing them needs a fresh computation
+    if cache_file is not None and cache_file.exists() and not sample_curves:
+        with np.load(cache_file) as c:
+            bands = {k: c[k] for k in c.files}
+    else:
+        bands, (cltt_band, clte_band, clee_band) = _compute_bands(baseline_cls, samples, pn_idx)
+        if cache_file is not None:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            np.savez_compressed(cache_file, **{k: v.astype(np.float32) for k, v in bands.items()})
+    cltt_mod, clte_mod, clee_mod = bands['cltt_mod'], bands['clte_mod'], bands['clee_mod']
+    cltt_lower, cltt_upper = bands['lo_tt'], bands['hi_tt']
+    clte_lower, clte_upper = bands['lo_te'], bands['hi_te']
+    clee_lower, clee_upper = bands['lo_ee'], bands['hi_ee']
+    
+    # Convert to Dl = l(l+1)Cl/(2π); the factor is computed once and shared by every curve
+    # (ell_mod is the baseline ell, and the bands use the same strided subset)
+    ell_mod = ell
+    stride = max(1, len(ell) // BAND_POINTS)
+    ell_band = ell[::stride]
+    dl_factor = ell * (ell + 1.0) / (2 * np.pi)
+    dl_band = dl_factor[::stride]
     
     # Plot TT/TE/EE
-    fig, axes = plt.subplots(3, 1, figsize=(7, 9), sharex=True)
+    fig, axes = plt.subplots(3, 1, figsize=(7, 9), sharex=True, constrained_layout=True)
     
     # TT
     ax = axes[0]
-    ax.plot(ell, cl_to_dl(ell, cltt_base), 'k-', lw=1.5, label='ΛCDM (baseline)', alpha=0.8)
-    ax.plot(ell_mod, cl_to_dl(ell_mod, cltt_mod), 'r-', lw=1.5, label='LGPD best-fit')
+    ax.plot(ell, dl_factor * cltt_base, 'k-', lw=1.5, label='ΛCDM (baseline)', alpha=0.8)
+    ax.plot(ell_mod, dl_factor * cltt_mod, 'r-', lw=1.5, label='LGPD best-fit')
     
     # Posterior band
-    cltt_band_arr = np.array(cltt_band)
-    cltt_lower = np.percentile(cltt_band_arr, 16, axis=0)
-    cltt_upper = np.percentile(cltt_band_arr, 84, axis=0)
-    ax.fill_between(ell_mod, cl_to_dl(ell_mod, cltt_lower), cl_to_dl(ell_mod, cltt_upper), 
-                     color='red', alpha=0.2, label='68% posterior')
+    ax.fill_between(ell_band, dl_band * cltt_lower, dl_band * cltt_upper, 
+                     color='red', alpha=0.2, label='68% posterior', rasterized=True)
+    if sample_curves:
+        _draw_sample_curves(ax, ell_band, dl_band * cltt_band[:sample_curves])
     
     ax.set_ylabel(r'$D_\ell^{TT}$ [$\mu$K$^2$]')
     ax.legend(loc='best', frameon=False)
@@ -126,14 +202,13 @@ def plot_power_spectra_with_bands(baseline_cls, samples, param_names, output_dir
     
     # TE
     ax = axes[1]
-    ax.plot(ell, cl_to_dl(ell, np.abs(clte_base)), 'k-', lw=1.5, alpha=0.8)
-    ax.plot(ell_mod, cl_to_dl(ell_mod, np.abs(clte_mod)), 'r-', lw=1.5)
+    ax.plot(ell, dl_factor * np.abs(clte_base), 'k-', lw=1.5, alpha=0.8)
+    ax.plot(ell_mod, dl_factor * np.abs(clte_mod), 'r-', lw=1.5)
     
-    clte_band_arr = np.array(clte_band)
-    clte_lower = np.percentile(np.abs(clte_band_arr), 16, axis=0)
-    clte_upper = np.percentile(np.abs(clte_band_arr), 84, axis=0)
-    ax.fill_between(ell_mod, cl_to_dl(ell_mod, clte_lower), cl_to_dl(ell_mod, clte_upper), 
-                     color='red', alpha=0.2)
+    ax.fill_between(ell_band, dl_band * clte_lower, dl_band * clte_upper, 
+                     color='red', alpha=0.2, rasterized=True)
+    if sample_curves:
+        _draw_sample_curves(ax, ell_band, dl_band * clte_band[:sample_curves])
     
     ax.set_ylabel(r'$|D_\ell^{TE}|$ [$\mu$K$^2$]')
     ax.set_yscale('log')
@@ -141,27 +216,28 @@ def plot_power_spectra_with_bands(baseline_cls, samples, param_names, output_dir
     
     # EE
     ax = axes[2]
-    ax.plot(ell, cl_to_dl(ell, clee_base), 'k-', lw=1.5, alpha=0.8)
-    ax.plot(ell_mod, cl_to_dl(ell_mod, clee_mod), 'r-', lw=1.5)
+    ax.plot(ell, dl_factor * clee_base, 'k-', lw=1.5, alpha=0.8)
+    ax.plot(ell_mod, dl_factor * clee_mod, 'r-', lw=1.5)
     
-    clee_band_arr = np.array(clee_band)
-    clee_lower = np.percentile(clee_band_arr, 16, axis=0)
-    clee_upper = np.percentile(clee_band_arr, 84, axis=0)
-    ax.fill_between(ell_mod, cl_to_dl(ell_mod, clee_lower), cl_to_dl(ell_mod, clee_upper), 
-                     color='red', alpha=0.2)
+    ax.fill_between(ell_band, dl_band * clee_lower, dl_band * clee_upper, 
+                     color='red', alpha=0.2, rasterized=True)
+    if sample_curves:
+        _draw_sample_curves(ax, ell_band, dl_band * clee_band[:sample_curves])
     
     ax.set_ylabel(r'$D_\ell^{EE}$ [$\mu$K$^2$]')
     ax.set_xlabel(r'Multipole $\ell$')
     ax.set_yscale('log')
     ax.grid(alpha=0.3)
     
-    plt.tight_layout()
+    # PNG for quick viewing; PDF for the paper, with the bands rasterized and the lines as vectors
     fig_path = output_dir / "fig1_power_spectra.png"
-    plt.savefig(fig_path)
+    fig.savefig(fig_path)
     print(f"Saved: {fig_path}")
+    fig.savefig(fig_path.with_suffix('.pdf'), dpi=200)
+    print(f"Saved: {fig_path.with_suffix('.pdf')}")
     plt.close()
 
-def plot_corner(samples, param_names, output_dir):
+def plot_corner(samples, pn_idx, output_dir):
     """
     Figure 2: Corner plot showing posterior distributions and correlations.
     """
@@ -173,9 +249,9 @@ def plot_corner(samples, param_names, output_dir):
         return
     
     # Extract main parameters
-    mu0_idx = param_names.index('mu_0')
-    Sigma0_idx = param_names.index('Sigma_0')
-    xi_idx = param_names.index('xi_damp')
+    mu0_idx = pn_idx['mu_0']
+    Sigma0_idx = pn_idx['Sigma_0']
+    xi_idx = pn_idx['xi_damp']
     
     plot_samples = samples[:, [mu0_idx, Sigma0_idx, xi_idx]]
     labels = [r'$\mu_0$', r'$\Sigma_0$', r'$\xi_{\rm damp}$']
@@ -190,32 +266,40 @@ def plot_corner(samples, param_names, output_dir):
     print(f"Saved: {fig_path}")
     plt.close()
 
-def plot_constraint_plane(samples, param_names, output_dir):
+def plot_constraint_plane(samples, pn_idx, output_dir):
     """
     Figure 3: 2D constraint plane for (mu0, Sigma0) with 68% and 95% contours.
     """
-    mu0_idx = param_names.index('mu_0')
-    Sigma0_idx = param_names.index('Sigma_0')
+    mu0_idx = pn_idx['mu_0']
+    Sigma0_idx = pn_idx['Sigma_0']
     
     mu0_samples = samples[:, mu0_idx]
     Sigma0_samples = samples[:, Sigma0_idx]
     
     fig, ax = plt.subplots(figsize=(6, 5))
     
-    # 2D histogram
-    H, xedges, yedges = np.histogram2d(mu0_samples, Sigma0_samples, bins=40)
-    extent = [xedges[0], xedges[-1], yedges[0], yedges[-1]]
+    if len(mu0_samples) < KDE_MAX_SAMPLES:
+        # Short chains give ragged 40x40 histograms; a Gaussian KDE on a 64x64 grid is smooth
+        kde = gaussian_kde(np.vstack([mu0_samples, Sigma0_samples]), bw_method='scott')
+        gx, gy = np.mgrid[mu0_samples.min():mu0_samples.max():64j,
+                          Sigma0_samples.min():Sigma0_samples.max():64j]
+        H = kde(np.vstack([gx.ravel(), gy.ravel()])).reshape(gx.shape)
+        grid, grid_kw = (gx, gy, H), {}
+    else:
+        # 2D histogram
+        H, xedges, yedges = np.histogram2d(mu0_samples, Sigma0_samples, bins=40)
+        extent = [xedges[0], xedges[-1], yedges[0], yedges[-1]]
+        grid, grid_kw = (H.T,), {'extent': extent}
     
     # Contour levels for 68% and 95%
     sorted_H = np.sort(H.flatten())[::-1]
     cumsum = np.cumsum(sorted_H) / np.sum(sorted_H)
-    level_68 = sorted_H[np.searchsorted(cumsum, 0.68)]
-    level_95 = sorted_H[np.searchsorted(cumsum, 0.95)]
+    level_68, level_95 = sorted_H[np.searchsorted(cumsum, [0.68, 0.95])]
     
-    ax.contour(H.T, extent=extent, levels=[level_95, level_68], 
-               colors=['blue', 'red'], linewidths=[1.5, 2])
-    ax.contourf(H.T, extent=extent, levels=[level_95, level_68, H.max()], 
-                colors=['lightblue', 'pink'], alpha=0.3)
+    ax.contour(*grid, levels=[level_95, level_68], 
+               colors=['blue', 'red'], linewidths=[1.5, 2], **grid_kw)
+    ax.contourf(*grid, levels=[level_95, level_68, H.max()], 
+                colors=['lightblue', 'pink'], alpha=0.3, rasterized=True, **grid_kw)
     
     # Mark GR point
     ax.plot(0, 0, 'kx', ms=10, mew=2, label='GR (μ₀=Σ₀=0)')
@@ -235,12 +319,12 @@ def plot_constraint_plane(samples, param_names, output_dir):
     print(f"Saved: {fig_path}")
     plt.close()
 
-def plot_AL_distribution(samples, param_names, output_dir):
+def plot_AL_distribution(samples, pn_idx, output_dir):
     """
     Figure 4: Distribution of effective A_L proxy from posterior.
     """
     # Compute A_L^eff = 1 + Sigma(k=0.1, z=2) for each sample
-    Sigma0_idx = param_names.index('Sigma_0')
+    Sigma0_idx = pn_idx['Sigma_0']
     Sigma0_samples = samples[:, Sigma0_idx]
     
     # Simple proxy: A_L^eff ≈ 1 + Sigma0 (at our pivot)
@@ -250,9 +334,7 @@ def plot_AL_distribution(samples, param_names, output_dir):
     ax.hist(AL_eff, bins=50, color='steelblue', alpha=0.7, edgecolor='black')
     
     # Mark median and 68% interval
-    median_AL = np.median(AL_eff)
-    lower_AL = np.percentile(AL_eff, 16)
-    upper_AL = np.percentile(AL_eff, 84)
+    lower_AL, median_AL, upper_AL = np.quantile(AL_eff, [0.16, 0.5, 0.84])
     
     ax.axvline(median_AL, color='red', lw=2, label=f'Median: {median_AL:.4f}')
     ax.axvline(lower_AL, color='red', lw=1, ls='--')
@@ -272,6 +354,13 @@ def plot_AL_distribution(samples, param_names, output_dir):
     print(f"Saved: {fig_path}")
     plt.close()
 
+def _make_figure(plot_fn, output_dir, *args, **kwargs):
+    """Process-pool task: open the posterior memmap in this process and draw one figure."""
+    # Only the file paths cross the process boundary; the samples are mapped, not pickled
+    samples, param_names, _ = load_posterior()
+    pn_idx = {name: i for i, name in enumerate(param_names)}
+    plot_fn(*args, samples, pn_idx, output_dir, **kwargs)
+
 def main():
     print("Generating all paper figures...")
     
@@ -288,19 +377,22 @@ def main():
     repo = DataRepository(repo_root / "data")
     ell, cls_dict = repo.load_planck_baseline()
     baseline_cls = (ell, cls_dict['TT'], cls_dict['TE'], cls_dict['EE'])
-    
-    # Generate figures
-    print("\n[1/4] Generating power spectra figure...")
-    plot_power_spectra_with_bands(baseline_cls, samples, param_names, output_dir)
-    
-    print("[2/4] Generating corner plot...")
-    plot_corner(samples, param_names, output_dir)
-    
-    print("[3/4] Generating constraint plane...")
-    plot_constraint_plane(samples, param_names, output_dir)
-    
-    print("[4/4] Generating A_L distribution...")
-    plot_AL_distribution(samples, param_names, output_dir)
+    # Bands are reused until the chain, the baseline, the band settings or the model changes
+    band_cache = _band_cache(repo_root / "outputs" / "posterior_chain.npz",
+                             Path(repo.path('planck_baseline_cls.npz')))
+    
+    # Generate figures: they are independent, so each runs in its own process
+    print("\nGenerating power spectra, corner plot, constraint plane and A_L distribution...")
+    jobs = [
+        (plot_power_spectra_with_bands, (baseline_cls,), {'cache_file': band_cache}),
+        (plot_corner, (), {}),
+        (plot_constraint_plane, (), {}),
+        (plot_AL_distribution, (), {}),
+    ]
+    with ProcessPoolExecutor(max_workers=len(jobs)) as ex:
+        futs = [ex.submit(_make_figure, fn, output_dir, *args, **kw) for fn, args, kw in jobs]
+        for fut in futs:
+            fut.result()
     
     print(f"\n✓ All figures saved to {output_dir}/")
     print("Ready for paper inclusion!")
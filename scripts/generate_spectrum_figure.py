@@ -24,6 +24,8 @@ Date: 2025-10-03
 """
 
 import numpy as np
+import matplotlib
+matplotlib.use('Agg', force=True)
 import matplotlib.pyplot as plt
 import sys
 from pathlib import Path
@@ -31,7 +33,7 @@ from pathlib import Path
 repo_root = Path(__file__).parent.parent
 sys.path.insert(0, str(repo_root))
 
-from lgpd_cosmo.data import DataRepository
+from lgpd_cosmo.data import DataRepository, load_posterior_chain
 from lgpd_cosmo.models import LGPDParams, CondensateParams, ElasticityParams, LGPDTransfer
 from lgpd_cosmo.cmb import apply_modifications
 
@@ -48,6 +50,7 @@ plt.rcParams.update({
     'savefig.dpi': 300,
     'savefig.bbox': 'tight',
 })
+plt.ioff()
 
 
 def cl_to_dl(ell, cl):
@@ -76,18 +79,15 @@ def main():
     # Load posterior
     print("  Loading posterior...")
     chain_file = repo_root / "outputs" / "posterior_chain.npz"
-    data = np.load(chain_file)
-    samples = data['samples']
-    param_names = list(data['param_names'])
+    samples, param_names, _ = load_posterior_chain(chain_file)
     
     # Get best-fit (median)
-    mu0_idx = param_names.index('mu_0')
-    Sigma0_idx = param_names.index('Sigma_0')
-    xi_idx = param_names.index('xi_damp')
+    pn_idx = {name: i for i, name in enumerate(param_names)}
+    mu0_col, Sigma0_col, xi_col = samples[:, [pn_idx['mu_0'], pn_idx['Sigma_0'], pn_idx['xi_damp']]].T
     
-    mu0_bf = np.median(samples[:, mu0_idx])
-    Sigma0_bf = np.median(samples[:, Sigma0_idx])
-    xi_bf = np.median(samples[:, xi_idx])
+    mu0_bf = np.median(mu0_col)
+    Sigma0_bf = np.median(Sigma0_col)
+    xi_bf = np.median(xi_col)
     
     print(f"  Best-fit: μ₀={mu0_bf:.4f}, Σ₀={Sigma0_bf:.4f}, ξ={xi_bf:.4f}")
     
@@ -105,13 +105,15 @@ def main():
     
     # Convert to D_ell
     ell_base, cltt_base, clte_base, clee_base = baseline_cls
-    Dltt_base = cl_to_dl(ell_base, cltt_base)
-    Dlte_base = cl_to_dl(ell_base, np.abs(clte_base))
-    Dlee_base = cl_to_dl(ell_base, clee_base)
-    
-    Dltt_mod = cl_to_dl(ell_mod, cltt_mod)
-    Dlte_mod = cl_to_dl(ell_mod, np.abs(clte_mod))
-    Dlee_mod = cl_to_dl(ell_mod, clee_mod)
+    # ℓ(ℓ+1)/(2π) once for all six curves (ell_mod is the baseline ell grid)
+    dl_factor = cl_to_dl(ell_base, 1.0)
+    Dltt_base = dl_factor * cltt_base
+    Dlte_base = dl_factor * np.abs(clte_base)
+    Dlee_base = dl_factor * clee_base
+    
+    Dltt_mod = dl_factor * cltt_mod
+    Dlte_mod = dl_factor * np.abs(clte_mod)
+    Dlee_mod = dl_factor * clee_mod
     
     # Create figure
     print("  Creating figure...")
@@ -25,7 +25,7 @@ REPO = Path(__file__).resolve().parents[1]
 
 def parse_results_and_cov(results_path: Path, cov_path: Path):
     # Parse central values
-    z_values = []
+    z_seen = set()
     dv_over_rs = {}
     f_ap = {}
     fsig8 = {}
@@ -40,17 +40,14 @@ def parse_results_and_cov(results_path: Path, cov_path: Path):
             z = float(parts[0]); kind = parts[1]; val = float(parts[2])
             if kind.lower().startswith('dv'):
                 dv_over_rs[z] = val
-                if z not in z_values:
-                    z_values.append(z)
+                z_seen.add(z)
             elif kind.lower().startswith('f_ap'):
                 f_ap[z] = val
-                if z not in z_values:
-                    z_values.append(z)
+                z_seen.add(z)
             elif kind.lower().startswith('fsig'):
                 fsig8[z] = val
-                if z not in z_values:
-                    z_values.append(z)
-    z_values = sorted(set(z_values))
+                z_seen.add(z)
+    z_values = sorted(z_seen)
 
     # Parse covariance (9x9) into matrix
     cov = np.loadtxt(cov_path)
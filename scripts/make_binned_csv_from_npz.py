@@ -35,15 +35,22 @@ def bin_uniform(ell, y, step):
     y = np.asarray(y)
     e_min, e_max = int(ell.min()), int(ell.max())
     edges = np.arange(e_min, e_max + step, step)
-    centers = []
-    vals = []
-    for i in range(len(edges) - 1):
-        m = (ell >= edges[i]) & (ell < edges[i + 1])
-        if not np.any(m):
-            continue
-        centers.append(float(ell[m].mean()))
-        vals.append(float(y[m].mean()))
-    return np.array(centers), np.array(vals)
+    if np.any(np.diff(ell) < 0):
+        order = np.argsort(ell, kind='stable')
+        ell, y = ell[order], y[order]
+    # ell is sorted, so each bin [edges[i], edges[i+1]) is a contiguous slice: per-bin sums
+    # come from one reduceat over the slice starts. Empty bins are dropped before the
+    # reduceat, so every remaining segment ends exactly at the next non-empty bin.
+    starts = np.searchsorted(ell, edges[:-1], side='left')
+    stop = np.searchsorted(ell, edges[-1], side='left')
+    counts = np.diff(np.append(starts, stop))
+    keep = counts > 0
+    starts, counts = starts[keep], counts[keep]
+    if len(starts) == 0:
+        return np.array([]), np.array([])
+    centers = np.add.reduceat(ell[:stop].astype(float), starts) / counts
+    vals = np.add.reduceat(y[:stop], starts) / counts
+    return centers, vals
 
 
 def write_csv(path, ell, Dl, frac, noise_floor):
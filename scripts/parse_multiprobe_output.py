@@ -10,36 +10,47 @@ Usage:
     --out_json outputs/multiprobe_summary.json
 """
 import argparse
-import json
 import re
+import sys
 import numpy as np
 from pathlib import Path
 
+repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root))
+
+from lgpd_cosmo.data import save_json
+
+# Compiled once; parse_log only runs a pattern on lines containing its literal key, so
+# the bulk of the log (sampler progress, warnings) is rejected by a substring test
+_BF_PAT = re.compile(r"BESTFIT\s+chi2=([0-9eE+\-.]+)\s+params=([0-9eE+\-.,]+)")
+_NAME_PAT = re.compile(r"PARAM_NAMES=([A-Za-z0-9_,]+)")
+_CHI2_PAT = re.compile(r"CHI2_([A-Z]+)=([0-9eE+\-.]+)")
+
+
 def parse_log(log_path: Path):
     bestfit = None
     chi2_blocks = {}
     param_names = None
     if not log_path.exists():
         return bestfit, chi2_blocks, param_names
-    bf_pat = re.compile(r"BESTFIT\s+chi2=([0-9eE+\-.]+)\s+params=([0-9eE+\-.,]+)")
-    name_pat = re.compile(r"PARAM_NAMES=([A-Za-z0-9_,]+)")
-    chi2_pat = re.compile(r"CHI2_([A-Z]+)=([0-9eE+\-.]+)")
     with log_path.open() as f:
         for line in f:
-            line = line.strip()
-            m = bf_pat.search(line)
-            if m:
-                chi2 = float(m.group(1))
-                params = [float(x) for x in m.group(2).split(',')]
-                bestfit = {'chi2': chi2, 'params': params}
-                continue
-            m = name_pat.search(line)
-            if m:
-                param_names = m.group(1).split(',')
-                continue
-            m = chi2_pat.search(line)
-            if m:
-                chi2_blocks[m.group(1)] = float(m.group(2))
+            if 'BESTFIT' in line:
+                m = _BF_PAT.search(line)
+                if m:
+                    chi2 = float(m.group(1))
+                    params = [float(x) for x in m.group(2).split(',')]
+                    bestfit = {'chi2': chi2, 'params': params}
+                    continue
+            if 'PARAM_NAMES=' in line:
+                m = _NAME_PAT.search(line)
+                if m:
+                    param_names = m.group(1).split(',')
+                    continue
+            if 'CHI2_' in line:
+                m = _CHI2_PAT.search(line)
+                if m:
+                    chi2_blocks[m.group(1)] = float(m.group(2))
     return bestfit, chi2_blocks, param_names
 
 
@@ -49,14 +60,12 @@ def summarize_posterior(posterior_path: Path):
     data = np.load(posterior_path, allow_pickle=True)
     chain = data['chain']
     names = data['param_names'] if 'param_names' in data else None
-    med = np.median(chain, axis=0)
-    lo = np.percentile(chain, 16, axis=0)
-    hi = np.percentile(chain, 84, axis=0)
+    lo, med, hi = np.percentile(chain, [16, 50, 84], axis=0)
     return {
         'param_names': [str(x) for x in names] if names is not None else None,
-        'median': med.tolist(),
-        'p16': lo.tolist(),
-        'p84': hi.tolist(),
+        'median': med,
+        'p16': lo,
+        'p84': hi,
     }
 
 
@@ -100,8 +109,7 @@ def main():
 
     # Write JSON
     out_json = Path(args.out_json)
-    with out_json.open('w') as fo:
-        json.dump({'bestfit': bestfit, 'chi2_blocks': chi2_blocks, 'param_names': param_names, 'posterior': posterior}, fo, indent=2)
+    save_json(out_json, {'bestfit': bestfit, 'chi2_blocks': chi2_blocks, 'param_names': param_names, 'posterior': posterior})
 
     print('Wrote', out_txt)
     print('Wrote', out_json)
@@ -19,19 +19,31 @@ Usage:
 """
 import argparse
 import os
-import json
 import numpy as np
-import matplotlib.pyplot as plt
 
 from lgpd_cosmo.models import (
     LGPDParams, CondensateParams, ElasticityParams, LGPDTransfer
 )
 from lgpd_cosmo.cmb import apply_modifications
+from lgpd_cosmo.data import load_posterior_chain, save_json
 
 
-def q68(x):
+def q68(x, axis=None):
+    """16th, 50th and 84th percentiles; with axis=0 a (3, k) array for a (N, k) chain."""
     x = np.asarray(x)
-    return np.percentile(x, [16, 50, 84])
+    return np.percentile(x, [16, 50, 84], axis=axis)
+
+
+def _pyplot():
+    """pyplot on the non-interactive Agg backend, imported on first use.
+
+    Deferred so that --help and argument errors do not pay for the matplotlib import;
+    the figures are only ever written to files, so no GUI backend is needed.
+    """
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+    import matplotlib.pyplot as plt
+    return plt
 
 
 def ensure_dir(p):
@@ -52,9 +64,12 @@ def overlay_tt(ell, base_cls, theta_med, out_png):
     tr = LGPDTransfer(lgpd, cond, elas)
     mod = apply_modifications(ell, base_cls, tr)
 
-    Dl0 = Dl_from_Cl(ell, base_cls['TT'])
-    Dl1 = Dl_from_Cl(ell, mod['TT'])
+    # ℓ(ℓ+1)/(2π) once, shared by both curves
+    pref = Dl_from_Cl(ell, 1.0)
+    Dl0 = pref * base_cls['TT']
+    Dl1 = pref * mod['TT']
 
+    plt = _pyplot()
     plt.figure(figsize=(8,5))
     plt.loglog(ell, Dl0, label='TT baseline', color='tab:blue')
     plt.loglog(ell, Dl1, label='TT modified (median θ)', color='tab:orange')
@@ -73,20 +88,24 @@ def main():
     ap.add_argument('--baseline', default='data/planck_baseline_cls.npz')
     ap.add_argument('--outdir', default='examples/_real_fit/diagnostics')
     args = ap.parse_args()
+    plt = _pyplot()
 
     ensure_dir(args.outdir)
 
-    # Load posterior
-    post = np.load(args.posterior)
-    chain = np.asarray(post['chain'])
-    logp = np.asarray(post['logprob'])
+    chain, _, logp = load_posterior_chain(args.posterior, dtype=None)
+    if logp is None:
+        raise SystemExit(f'{args.posterior} has no logprob array.')
     if chain.ndim != 2 or chain.shape[1] != 3:
         raise SystemExit(f'Unexpected chain shape: {chain.shape}. Expected (N,3).')
+    # Per-parameter contiguous copies for the plots; chain[:, i] is a strided view
+    cols = np.ascontiguousarray(chain.T)
 
     names = ['mu0','sigma0','xi_damp']
     stats = {}
+    # all columns in one call: a single partition pass rather than one per parameter
+    qs = q68(chain[:, :len(names)], axis=0)
     for i, n in enumerate(names):
-        lo, med, hi = q68(chain[:, i])
+        lo, med, hi = qs[:, i]
         stats[n] = {
             'p16': float(lo), 'p50': float(med), 'p84': float(hi),
         }
@@ -100,22 +119,21 @@ def main():
             f.write(f"{n},{s['p16']},{s['p50']},{s['p84']}\n")
 
     # Save JSON summary
-    with open(os.path.join(args.outdir, 'posterior_summary.json'), 'w') as f:
-        json.dump({
-            'stats': stats,
-            'logprob': {
-                'mean': float(logp.mean()),
-                'min': float(logp.min()),
-                'max': float(logp.max()),
-            }
-        }, f, indent=2)
+    save_json(os.path.join(args.outdir, 'posterior_summary.json'), {
+        'stats': stats,
+        'logprob': {
+            'mean': float(logp.mean()),
+            'min': float(logp.min()),
+            'max': float(logp.max()),
+        }
+    })
 
     # Plots: histograms
     bins = 60
     colors = dict(mu0='#f39c12', sigma0='#27ae60', xi_damp='#2980b9')
     for i, n in enumerate(names):
         plt.figure(figsize=(8,5))
-        plt.hist(chain[:, i], bins=bins, color=colors[n], alpha=0.9, density=True)
+        plt.hist(cols[i], bins=bins, color=colors[n], alpha=0.9, density=True)
         plt.title(f'Posterior histogram: {n}')
         plt.xlabel(n)
         plt.ylabel('density')
@@ -126,7 +144,7 @@ def main():
 
     # Scatter: mu0 vs sigma0
     plt.figure(figsize=(8,5))
-    plt.scatter(chain[:,0], chain[:,1], s=5, c='#f39c12', alpha=0.35)
+    plt.scatter(cols[0], cols[1], s=5, c='#f39c12', alpha=0.35)
     plt.title('Posterior scatter: mu0 vs sigma0')
     plt.xlabel('mu0')
     plt.ylabel('sigma0')
@@ -1,15 +1,19 @@
 #!/usr/bin/env python3
 """Quick figure generation for paper."""
 import numpy as np
+import matplotlib
+matplotlib.use('Agg', force=True)
 import matplotlib.pyplot as plt
+import sys
 from pathlib import Path
 
 repo_root = Path(__file__).parent.parent
+sys.path.insert(0, str(repo_root))
 
-# Load posterior
-data = np.load(repo_root / "outputs" / "posterior_chain.npz")
-samples = data['samples']
-param_names = data['param_names'].tolist()
+from lgpd_cosmo.data import load_posterior_chain
+
+# Load posterior: a read-only float32 memmap, so only the pages actually touched are read
+samples, param_names, _ = load_posterior_chain(repo_root / "outputs" / "posterior_chain.npz")
 
 print(f"Loaded {len(samples)} samples")
 
@@ -39,17 +43,19 @@ except Exception as e:
     print(f"Corner plot failed: {e}")
 
 # Figure 2: Constraint plane
-mu0_samples = samples[:, param_names.index('mu_0')]
-Sigma0_samples = samples[:, param_names.index('Sigma_0')]
+# Strided memmap columns are copied out once as small contiguous arrays for numpy/matplotlib
+mu0_samples = np.ascontiguousarray(samples[:, param_names.index('mu_0')])
+Sigma0_samples = np.ascontiguousarray(samples[:, param_names.index('Sigma_0')])
 
 fig, ax = plt.subplots(figsize=(6, 5))
 H, xedges, yedges = np.histogram2d(mu0_samples, Sigma0_samples, bins=40)
 extent = [xedges[0], xedges[-1], yedges[0], yedges[-1]]
 
-sorted_H = np.sort(H.flatten())[::-1]
+# Highest-density levels: the mass-enclosing CDF needs the full descending order of the
+# 1600 bins (a partition cannot give it), so sort once and look up both levels together
+sorted_H = np.sort(H.ravel())[::-1]
 cumsum = np.cumsum(sorted_H) / np.sum(sorted_H)
-level_68 = sorted_H[np.searchsorted(cumsum, 0.68)]
-level_95 = sorted_H[np.searchsorted(cumsum, 0.95)]
+level_68, level_95 = sorted_H[np.searchsorted(cumsum, [0.68, 0.95])]
 
 ax.contour(H.T, extent=extent, levels=[level_95, level_68], 
            colors=['blue', 'red'], linewidths=[1.5, 2])
@@ -74,9 +80,7 @@ AL_eff = 1.0 + Sigma0_samples
 fig, ax = plt.subplots(figsize=(6, 4))
 ax.hist(AL_eff, bins=50, color='steelblue', alpha=0.7, edgecolor='black')
 
-median_AL = np.median(AL_eff)
-lower_AL = np.percentile(AL_eff, 16)
-upper_AL = np.percentile(AL_eff, 84)
+lower_AL, median_AL, upper_AL = np.percentile(AL_eff, [16, 50, 84])
 
 ax.axvline(median_AL, color='red', lw=2, label=f'Median: {median_AL:.4f}')
 ax.axvline(lower_AL, color='red', lw=1, ls='--')
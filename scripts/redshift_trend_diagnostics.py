@@ -19,7 +19,6 @@ Notes:
   minimizing chi^2 w.r.t. a constant offset.
 """
 import argparse
-import json
 from pathlib import Path
 
 import numpy as np
@@ -29,7 +28,7 @@ import sys
 repo_root = Path(__file__).parent.parent
 sys.path.insert(0, str(repo_root))
 
-from lgpd_cosmo.data import DataRepository
+from lgpd_cosmo.data import DataRepository, save_json
 from lgpd_cosmo.background import LCDM
 from lgpd_cosmo.linear import GrowthModel
 
@@ -43,18 +42,19 @@ def fit_offset(residuals, sigma):
 
 
 def bao_DV_over_rd(lcdm: LCDM, z):
-    z = np.asarray(z)
+    z = np.asarray(z, dtype=float)
     c = 299792.458
-    Hz = np.array([lcdm.H(zi) for zi in z])
-    chi = np.array([lcdm.comoving_distance(zi) for zi in z])
+    # H is elementwise; distances come from one cumulative integral over a shared z grid
+    Hz = lcdm.H(z)
+    chi = lcdm.comoving_distance_array(z)
     DV = (c * z * (chi ** 2) / Hz) ** (1.0 / 3.0)
     rd = 147.1  # Mpc, effective constant for trend diagnostics
     return DV / rd
 
 
 def sne_mu_model(lcdm: LCDM, z):
-    z = np.asarray(z)
-    DL = np.array([lcdm.luminosity_distance(zi) for zi in z])  # Mpc
+    z = np.asarray(z, dtype=float)
+    DL = lcdm.luminosity_distance_array(z)  # Mpc
     return 5.0 * np.log10(np.maximum(DL, 1e-8)) + 25.0
 
 
@@ -192,12 +192,11 @@ def main():
         np.savetxt(out_dir / 'growth_residuals.csv', np.vstack([z, resid]).T, delimiter=',', header='z,residual', comments='')
 
     # Save JSON summary
-    with open(out_dir / 'trend_summary.json', 'w') as f:
-        json.dump({
-            'mu_model': mu_model,
-            'params': {'mu0': mu0, 'mu_low': mu_low, 'mu_high': mu_high, 'z_split': z_split},
-            'summary': summary
-        }, f, indent=2)
+    save_json(out_dir / 'trend_summary.json', {
+        'mu_model': mu_model,
+        'params': {'mu0': mu0, 'mu_low': mu_low, 'mu_high': mu_high, 'z_split': z_split},
+        'summary': summary
+    })
 
     print('Wrote diagnostics to', out_dir)
 
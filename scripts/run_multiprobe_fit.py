@@ -124,8 +124,8 @@ def main():
                 z = np.asarray(z)
                 # Use standard DV definition approx (not exact). For exploration only.
                 c = 299792.458
-                Hz = np.array([lcdm.H(zi) for zi in z])
-                chi = np.array([lcdm.comoving_distance(zi) for zi in z])
+                Hz = lcdm.H(z)
+                chi = lcdm.comoving_distance_array(z)
                 DV = ((c*z*(chi**2)/Hz)**(1.0/3.0))
                 rd = 147.1  # Mpc (placeholder constant); treat as effective rd; document in README
                 return DV/rd
@@ -135,7 +135,7 @@ def main():
             sne = repo.load_sne("sne_pantheon.csv")
             def mu_model(z):
                 z = np.asarray(z)
-                DL = np.array([lcdm.luminosity_distance(zi) for zi in z])  # Mpc
+                DL = lcdm.luminosity_distance_array(z)  # Mpc
                 return 5.0*np.log10(np.maximum(DL, 1e-6)) + 25.0
             chi2_sne = L.add_sne(sne, mu_model)
 
@@ -251,8 +251,8 @@ def main():
         def DV_over_rd_model(z):
             z = np.asarray(z)
             c = 299792.458
-            Hz = np.array([lcdm.H(zi) for zi in z])
-            chi = np.array([lcdm.comoving_distance(zi) for zi in z])
+            Hz = lcdm.H(z)
+            chi = lcdm.comoving_distance_array(z)
             DV = ((c*z*(chi**2)/Hz)**(1.0/3.0))
             rd = 147.1
             return DV/rd
@@ -261,7 +261,7 @@ def main():
         sne = repo.load_sne("sne_pantheon.csv")
         def mu_model(z):
             z = np.asarray(z)
-            DL = np.array([lcdm.luminosity_distance(zi) for zi in z])
+            DL = lcdm.luminosity_distance_array(z)
             return 5.0*np.log10(np.maximum(DL, 1e-6)) + 25.0
         chi2_sne = Lbf.add_sne(sne, mu_model)
     if have_growth:
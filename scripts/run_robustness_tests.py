@@ -206,9 +206,7 @@ def run_prior_sensitivity(output_dir, quick=False):
                                          rng=np.random.default_rng(43 if name=='wide' else 44))
         
         # Compute medians and 68% CI
-        medians = np.median(chain, axis=0)
-        lower = np.percentile(chain, 16, axis=0)
-        upper = np.percentile(chain, 84, axis=0)
+        lower, medians, upper = np.percentile(chain, [16, 50, 84], axis=0)
         
         print(f"  Results:")
         for i, pname in enumerate(param_names):
@@ -252,9 +250,7 @@ def run_dataset_ablations(output_dir, quick=False):
                                          nwalkers=24, nsteps=nsteps, nburn=150,
                                          rng=np.random.default_rng(seed))
         
-        medians = np.median(chain, axis=0)
-        lower = np.percentile(chain, 16, axis=0)
-        upper = np.percentile(chain, 84, axis=0)
+        lower, medians, upper = np.percentile(chain, [16, 50, 84], axis=0)
         
         print(f"  Results:")
         for i, pname in enumerate(param_names):
@@ -0,0 +1,56 @@
+import unittest
+
+import numpy as np
+
+from lgpd_cosmo import _kernels
+from lgpd_cosmo.cmb import CMBModulator
+from lgpd_cosmo.models import (CondensateParams, ElasticityParams, LGPDParams,
+                               LGPDTransfer)
+
+
+def _transfer(mu0=0.0, sigma0=0.0, xi_damp=0.0):
+    return LGPDTransfer(LGPDParams(xi_damp=xi_damp), CondensateParams(mu0=mu0),
+                        ElasticityParams(sigma0=sigma0))
+
+
+class CMBModulatorTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.ell = np.arange(2.0, 2501.0)
+        self.cls = {key: rng.uniform(0.5, 1.5, self.ell.size) for key in ('TT', 'TE', 'EE')}
+        self.theta = np.column_stack([rng.uniform(-0.1, 0.1, 6), rng.uniform(-0.1, 0.1, 6),
+                                      rng.uniform(0.0, 0.5, 6)])
+
+    def test_batched_matches_per_walker(self):
+        batched = _transfer().apply_batched(self.ell, self.cls, self.theta)
+        modulator = CMBModulator(self.ell)
+        for i, row in enumerate(self.theta):
+            single = modulator.apply(self.cls, _transfer(*row))
+            for key in self.cls:
+                np.testing.assert_allclose(batched[key][i], single[key], rtol=1e-12)
+
+    def test_numba_kernel_matches_numpy(self):
+        if not _kernels.HAVE_NUMBA:
+            self.skipTest('numba not installed')
+        modulator = CMBModulator(self.ell)
+        for row in self.theta:
+            tr = _transfer(*row)
+            fused = modulator.apply(self.cls, tr)
+            _kernels.HAVE_NUMBA = False
+            try:
+                plain = modulator.apply(self.cls, tr)
+            finally:
+                _kernels.HAVE_NUMBA = True
+            for key in self.cls:
+                np.testing.assert_allclose(fused[key], plain[key], rtol=1e-12)
+
+    def test_baseline_modified_in_place(self):
+        modulator = CMBModulator(self.ell)
+        tr = _transfer(*self.theta[0])
+        before = modulator.apply(self.cls, tr)['TT'].copy()
+        self.cls['TT'] *= 2.0
+        np.testing.assert_allclose(modulator.apply(self.cls, tr)['TT'], 2.0*before, rtol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import lgpd_cosmo.data as data
+from lgpd_cosmo.data import DataRepository, load_posterior_chain, save_json
+
+
+class DataRepositoryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        with open(os.path.join(self.tmp.name, 'bao.csv'), 'w') as f:
+            f.write('z,DV_over_rd,sigma\n0.38,10.2,0.2\n0.51,13.4,0.2\n')
+
+    def test_loaders_return_independent_copies(self):
+        repo = DataRepository(self.tmp.name)
+        bao = repo.load_bao('bao.csv')
+        bao[:, 1] *= 2.0
+        np.testing.assert_array_equal(repo.load_bao('bao.csv')[:, 1], [10.2, 13.4])
+        z, _, _ = repo.load_simple_binned('bao.csv')
+        z += 1.0
+        np.testing.assert_array_equal(repo.load_simple_binned('bao.csv')[0], [0.38, 0.51])
+
+
+class PosteriorChainTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, 'posterior.npz')
+
+    def _write(self, chain, mtime=None):
+        np.savez(self.path, chain=chain, logprob=-chain[:, 0])
+        if mtime is not None:
+            os.utime(self.path, (mtime, mtime))
+
+    def test_cached_copy_matches_npz(self):
+        chain = np.arange(12.0).reshape(4, 3)
+        self._write(chain)
+        for _ in range(2):  # converting, then served from .cache/
+            samples, names, log_prob = load_posterior_chain(self.path, dtype=None)
+            np.testing.assert_array_equal(samples, chain)
+            np.testing.assert_array_equal(log_prob, -chain[:, 0])
+            self.assertIsNone(names)
+
+    def test_npz_replaced_by_older_file(self):
+        self._write(np.zeros((4, 3)))
+        load_posterior_chain(self.path)
+        # same size, older mtime (as after cp -p or a restore from archive)
+        self._write(np.ones((4, 3)), mtime=os.path.getmtime(self.path) - 3600)
+        samples, _, _ = load_posterior_chain(self.path)
+        np.testing.assert_array_equal(samples, np.ones((4, 3)))
+
+    def test_unwritable_cache_falls_back_to_npz(self):
+        self._write(np.ones((4, 3)))
+        # a plain file where the cache directory would go makes every cache write fail
+        open(os.path.join(self.tmp.name, '.cache'), 'w').close()
+        samples, _, log_prob = load_posterior_chain(self.path)
+        self.assertEqual(samples.dtype, np.float32)
+        np.testing.assert_array_equal(log_prob, -np.ones(4))
+
+
+class SaveJsonTest(unittest.TestCase):
+    obj = {
+        'stats': {'p50': np.float64(0.25), 'n': np.int64(7)},
+        'grid': np.arange(6.0).reshape(2, 3).T,  # non-contiguous
+        'bad': [np.nan, np.inf],
+        'f32': np.arange(3, dtype=np.float32) / 3,
+        'f32_scalar': np.float32(0.1),
+        np.int64(3): 'numpy key',
+    }
+    expected = {
+        'stats': {'p50': 0.25, 'n': 7},
+        'grid': [[0.0, 3.0], [1.0, 4.0], [2.0, 5.0]],
+        'bad': [None, None],
+        'f32': [0.0, 0.33333334, 0.6666667],
+        'f32_scalar': 0.1,
+        '3': 'numpy key',
+    }
+
+    def _dump(self):
+        with tempfile.NamedTemporaryFile('r', suffix='.json') as f:
+            save_json(f.name, self.obj)
+            return f.read()
+
+    def test_round_trip(self):
+        self.assertEqual(json.loads(self._dump()), self.expected)
+
+    def test_backends_agree(self):
+        if data.orjson is None:
+            self.skipTest('orjson not installed')
+        out = self._dump()
+        orjson, data.orjson = data.orjson, None
+        try:
+            self.assertEqual(self._dump(), out)
+        finally:
+            data.orjson = orjson
+
+
+if __name__ == '__main__':
+    unittest.main()
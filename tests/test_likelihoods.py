@@ -0,0 +1,56 @@
+import unittest
+
+import numpy as np
+
+from lgpd_cosmo import _kernels
+from lgpd_cosmo.likelihoods import PlanckBinnedLike, precompute_interp
+
+
+class PrecomputeInterpTest(unittest.TestCase):
+    def test_matches_np_interp(self):
+        rng = np.random.default_rng(1)
+        grid = np.sort(rng.uniform(2.0, 2500.0, 300))
+        values = rng.normal(size=grid.size)
+        # random points plus the grid nodes themselves, including both ends
+        ells = np.concatenate([rng.uniform(grid[0], grid[-1], 500), grid])
+        idx, w = precompute_interp(ells, grid)
+        np.testing.assert_allclose(values[idx]*(1 - w) + values[idx+1]*w,
+                                   np.interp(ells, grid, values), rtol=1e-12, atol=1e-12)
+
+    def test_rejects_degenerate_grid(self):
+        with self.assertRaises(ValueError):
+            precompute_interp([10.0], [10.0])
+        with self.assertRaises(ValueError):
+            precompute_interp([10.0, 20.0], [2.0, 10.0, 10.0, 30.0])
+
+
+class PlanckBinnedLikeTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        self.ell = np.arange(2.0, 600.0)
+        ell_b = np.linspace(10.0, 590.0, 40)
+        self.like = PlanckBinnedLike(ell_b, rng.normal(1000.0, 50.0, ell_b.size),
+                                     np.full(ell_b.size, 20.0), self.ell)
+        self.models = rng.normal(1000.0, 50.0, (8, self.ell.size))
+
+    def _numpy_chi2(self, model):
+        r = (self.like.Dl_data - self.like.model_at_bins(model)) * self.like.inv_sigma
+        return np.sum(r*r)
+
+    def test_batched_matches_per_walker(self):
+        batched = self.like.chi2(self.models)
+        self.assertEqual(batched.shape, (8,))
+        per_walker = [self.like.chi2(m) for m in self.models]
+        np.testing.assert_allclose(batched, per_walker, rtol=1e-10)
+
+    def test_chi2_kernel_matches_numpy(self):
+        # Runs the compiled kernel when numba is installed, the plain Python one otherwise
+        like = self.like
+        for model in self.models:
+            chi2 = _kernels.chi2_interp(like.idx, like.w_lo, like.w_hi, like.inv_sigma,
+                                        like.Dl_data, model)
+            self.assertAlmostEqual(chi2 / self._numpy_chi2(model), 1.0, places=10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+import numpy as np
+
+from lgpd_cosmo.background import LCDM
+from lgpd_cosmo.linear import GrowthModel
+
+
+def _rk2_reference(model, a_array, w=-1.0):
+    # The fixed-step midpoint integrator GrowthModel.solve used before solve_ivp
+    def deriv(y, a):
+        D, Dp = y
+        Dpp = -((3.0/a) + model.dlnH_dlna(a, w=w))*Dp \
+            + 1.5*model.Om_a(a)*(1 + model.mu_of_a_fn(a))*D/(a*a)
+        return [Dp, Dpp]
+    a_array = np.sort(np.asarray(a_array, dtype=float))
+    y, a_prev = [a_array[0], 1.0], a_array[0]
+    D = [y[0]]
+    for ai in a_array[1:]:
+        steps = max(5, int((ai - a_prev)/1e-3))
+        da = (ai - a_prev)/steps
+        a = a_prev
+        for _ in range(steps):
+            k1 = deriv(y, a)
+            k2 = deriv([y[0] + 0.5*da*k1[0], y[1] + 0.5*da*k1[1]], a + 0.5*da)
+            y = [y[0] + da*k2[0], y[1] + da*k2[1]]
+            a += da
+        D.append(y[0])
+        a_prev = ai
+    return np.array(D) / D[-1]
+
+
+class GrowthSolveTest(unittest.TestCase):
+    def test_matches_fixed_step_reference(self):
+        a = np.linspace(0.05, 1.0, 40)
+        for mu in (None, lambda a: 0.1):
+            model = GrowthModel(LCDM(), mu_of_a_fn=mu)
+            _, D = model.solve(a)
+            np.testing.assert_allclose(D, _rk2_reference(model, a), rtol=2e-4)
+
+    def test_scale_factors_below_floor(self):
+        # Every a below 1e-4 is floored, not only the first one
+        a_vals, D = GrowthModel(LCDM()).solve([1e-5, 5e-5, 0.5, 1.0])
+        np.testing.assert_array_equal(a_vals, [1e-4, 1e-4, 0.5, 1.0])
+        self.assertEqual(D[0], D[1])
+        self.assertEqual(D[-1], 1.0)
+        self.assertTrue(np.all(np.diff(D) >= 0))
+
+    def test_repeated_scale_factors(self):
+        a_vals, D = GrowthModel(LCDM()).solve([0.5, 0.5, 1.0])
+        self.assertEqual(len(D), 3)
+        self.assertEqual(D[0], D[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
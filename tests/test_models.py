@@ -0,0 +1,42 @@
+import unittest
+
+import numpy as np
+
+from lgpd_cosmo.models import (CondensateParams, ElasticityParams, LGPDParams,
+                               LGPDTransfer, gamma_of_a)
+
+
+def _transfer(xi_damp=0.3):
+    return LGPDTransfer(LGPDParams(xi_damp=xi_damp), CondensateParams(), ElasticityParams())
+
+
+class DampingEnvelopeTest(unittest.TestCase):
+    def test_ell_modified_in_place(self):
+        # The cached ell(ell+1) shape must follow the values, not the array identity
+        tr = _transfer()
+        ell = np.arange(2.0, 200.0)
+        tr.Dl_mod_factor(ell)
+        ell *= 2
+        expected = np.exp(-0.3 * ell*(ell+1.0) / 1500.0**2)
+        np.testing.assert_allclose(tr.Dl_mod_factor(ell), expected, rtol=1e-12)
+
+    def test_scalar_ell(self):
+        tr = _transfer()
+        expected = np.exp(-0.3 * 1000.0*1001.0 / 1500.0**2)
+        for ell in (1000.0, 1000):
+            out = tr.Dl_mod_factor(ell)
+            self.assertEqual(np.ndim(out), 0)
+            self.assertAlmostEqual(float(out), expected, places=12)
+
+
+class GammaTest(unittest.TestCase):
+    def test_memoized_result_is_a_private_copy(self):
+        a = np.linspace(0.1, 1.0, 50)
+        g = gamma_of_a(a, LGPDParams())
+        expected = g.copy()
+        g *= 0.0
+        np.testing.assert_array_equal(gamma_of_a(a, LGPDParams()), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()